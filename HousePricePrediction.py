@@ -1,16 +1,108 @@
+from lazy_imports import lazy_import, startup_profiler
+startup_profiler.track_imports()
+
 import tkinter as tk
-from tkinter import ttk
-import pandas as pd
+from tkinter import simpledialog, ttk
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-from sklearn.linear_model import LinearRegression
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import customtkinter as ctk     
-from PIL import Image, ImageTk, ImageEnhance, ImageFilter
-import urllib.request
+import atexit
+import os
+import sys
+import time
 from io import BytesIO
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from currency import format_indian_currency
+from estimate_history import EstimateHistory
+from feature_schema import FEATURE_SCHEMA, FEATURE_SPECS, parse_inputs
+from frame_clock import FrameClock
+from instrumentation import instrumentation
+from prediction_cache import PredictionCache
+from sales_log import DEFAULT_SALES_PATH
+from sensitivity import SWEEP_RANGES, SensitivityChart, SweepGrid, sweep_values
+from valuation_defaults import DEFAULT_LEVEL, DEFAULT_NEIGHBOURS, DEFAULT_REPLICAS
+
+# The model stack (house_model, model_store, online_model and the sklearn, scipy and
+# pandas they load) is imported on the model worker thread, never here, so the window
+# does not wait for it. Heavy optional modules, only imported when a feature first
+# touches them:
+plt = lazy_import('matplotlib.pyplot')
+backend_tkagg = lazy_import('matplotlib.backends.backend_tkagg')  # FigureCanvasTkAgg
+Image = lazy_import('PIL.Image')
+ImageTk = lazy_import('PIL.ImageTk')
+ImageEnhance = lazy_import('PIL.ImageEnhance')
+ImageFilter = lazy_import('PIL.ImageFilter')
+urllib_request = lazy_import('urllib.request')
+
+startup_profiler.stop_tracking_imports()
+
+# How often the Tk loop checks whether background training has finished
+MODEL_POLL_MS = 50
+
+# Bootstrap replicas behind the price range in the result popup; 0 shows the point estimate only
+BOOTSTRAP_REPLICAS = int(os.environ.get('HOUSE_PRICE_BOOTSTRAP_REPLICAS', DEFAULT_REPLICAS))
+
+# Most similar training properties listed in the result popup; 0 hides them
+COMPARABLE_COUNT = int(os.environ.get('HOUSE_PRICE_COMPARABLES', DEFAULT_NEIGHBOURS))
+
+# Weight kept by earlier rows each time a recorded sale is folded into the model
+# (e.g. 0.99); unset or 0 keeps every row at full weight
+ONLINE_DECAY = float(os.environ.get('HOUSE_PRICE_ONLINE_DECAY', 0)) or None
+
+# Frame periods for the header colour cycle and the popup's price count-up
+HEADER_FRAME_MS = 800
+PRICE_FRAME_MS = 50
+
+# With --metrics: how often the timing histograms are written out, and how often the
+# F12 debug overlay refreshes
+METRICS_EXPORT_MS = 10000
+OVERLAY_REFRESH_MS = 500
+
+# Rendered background images kept for reuse, keyed by (width, height, colours)
+GRADIENT_CACHE_SIZE = 4
+# Quiet period after the last <Configure> event before the layout is updated
+RESIZE_DEBOUNCE_MS = 150
+# The background is rendered for the window size rounded up to this many pixels, so
+# small resizes reuse the current image instead of rendering a new one
+BACKGROUND_BUCKET_PX = 128
+
+
+def render_gradient(width, height, colors):
+    # Vertical gradient through `colors` as one PIL image, computed in a single
+    # NumPy pass. Matches interpolate_color: channels are truncated, not rounded.
+    if len(colors) == 1:
+        colors = (colors[0], colors[0])
+    stops = np.array([[int(c[1:3], 16), int(c[3:5], 16), int(c[5:7], 16)] for c in colors],
+                     dtype=np.float64)
+    position = np.arange(height, dtype=np.float64) / height * (len(stops) - 1)
+    segment = np.minimum(position.astype(np.intp), len(stops) - 2)
+    ratio = (position - segment)[:, None]
+    column = (stops[segment] * (1 - ratio) + stops[segment + 1] * ratio).astype(np.uint8)
+
+    # One pixel wide, then stretched horizontally in C
+    return Image.fromarray(column.reshape(height, 1, 3), 'RGB').resize((width, height), Image.NEAREST)
+
+
+# Run on the model worker thread, which is the first to import the model stack
+def _load_model(feature_names):
+    # (scaler, model, predictor, params, version) of the active model
+    from house_model import make_predictor
+    from model_store import active_params, cache_key, load_or_train
+    params = active_params()
+    scaler, model = load_or_train(params, feature_names)
+    return scaler, model, make_predictor(scaler, model), params, cache_key(params, feature_names)
+
+
+def _load_ensemble(feature_names):
+    # The replicas are fitted in this process (max_workers=1): the training set is small,
+    # forking a process that runs Tk is unsafe, and the result is cached on disk
+    from model_store import load_or_train_ensemble
+    return load_or_train_ensemble(n_replicas=BOOTSTRAP_REPLICAS, feature_names=feature_names, max_workers=1)
+
+
+def _load_comparables(feature_names):
+    from model_store import load_or_build_comparables
+    return load_or_build_comparables(feature_names=feature_names)
 
 class HousePricePredictionApp:
     def __init__(self, root):
@@ -45,22 +137,41 @@ class HousePricePredictionApp:
         self.root.minsize(1024, 768)
         
         # Initialize features
-        self.features = {
-            'Square_Footage': tk.StringVar(),
-            'Bedrooms': tk.StringVar(),
-            'Bathrooms': tk.StringVar(),
-            'Location_Rating': tk.StringVar(),
-            'Floor_Number': tk.StringVar(),
-            'Parking_Spots': tk.StringVar(),
-            'Swimming_Pool': tk.StringVar(),
-            'Security_Rating': tk.StringVar()
-        }
+        self.features = {spec.name: tk.StringVar() for spec in FEATURE_SCHEMA}
+
+        # What-if chart window, built on first use
+        self.sweep_window = None
+
+        # Result popup, built on the first valuation and then reused
+        self.result_popup = None
+        self._price_animation = None
+        self._price_shown = self._price_target = 0
+
+        # Every animation runs off this one clock, which stops while the window is hidden
+        self.frame_clock = FrameClock(self.root)
 
         # Rest of the initialization
-        self.initialize_model()
+        with startup_profiler.phase('initialize_model'):
+            self.initialize_model()
         self.root.configure(bg=self.style['bg_primary'])
         
         # Create main containers and UI elements
+        with startup_profiler.phase('main containers'):
+            self._create_main_containers(root)
+
+        # Create UI sections
+        with startup_profiler.phase('header'):
+            self.create_glass_effect_header()
+        with startup_profiler.phase('content'):
+            self.create_glass_effect_content()
+        with startup_profiler.phase('prediction section'):
+            self.create_prediction_section()
+        startup_profiler.report()
+
+        if instrumentation.enabled:
+            self._setup_instrumentation()
+
+    def _create_main_containers(self, root):
         self.main_canvas = tk.Canvas(
             root,
             bg=self.style['bg_primary'],
@@ -74,28 +185,14 @@ class HousePricePredictionApp:
         )
         self.main_container.pack(expand=True, fill='both', padx=30, pady=30)
 
-        # Create UI sections
-        self.create_glass_effect_header()
-        self.create_glass_effect_content()
-        self.create_prediction_section()
-
-    def create_gradient_background(self, width, height):
-        gradient_canvas = tk.Canvas(
-            self.root,
-            width=width,
-            height=height,
-            highlightthickness=0
-        )
-        gradient_canvas.place(x=0, y=0, relwidth=1, relheight=1)
-        
-        # Create a more vibrant gradient
-        for i in range(0, height, 2):
-            ratio = i / height
-            if ratio < 0.5:
-                color = self.interpolate_color('#0A192F', '#112240', ratio * 2)
-            else:
-                color = self.interpolate_color('#112240', '#1A2F4E', (ratio - 0.5) * 2)
-            gradient_canvas.create_line(0, i, width, i, fill=color)
+        # Gradient background: one image item on the canvas, redrawn after resizes settle
+        self._gradient_cache = OrderedDict()
+        self._gradient_item = None
+        self._background_bucket = None
+        self._header_font_size = 42
+        self._padding = (30, 30)
+        self._resize_job = None
+        self.root.bind('<Configure>', self.on_window_resize, add='+')
 
     def create_glass_effect_header(self):
         header_frame = ctk.CTkFrame(
@@ -116,10 +213,12 @@ class HousePricePredictionApp:
             accent_line.pack(fill='x', pady=(10 
                                              if i == 0 else 5), padx=100)
 
+        # One font object, resized in place by update_responsive_layout
+        self.header_font = ctk.CTkFont(family="Helvetica", size=42, weight="bold")
         self.header_label = ctk.CTkLabel(
             header_frame,
             text="✨ Premium Property Valuation ✨",
-            font=("Helvetica", 42, "bold"),
+            font=self.header_font,
             text_color=self.style['accent'],
         )
         self.header_label.pack(pady=20)
@@ -130,13 +229,14 @@ class HousePricePredictionApp:
         colors = ['#FF2E63', '#00FFF5', '#FFFFFF']  # Neon pink, cyan, and white
         current_color = 0
         
-        def update_color():
+        def update_color(frames):
             nonlocal current_color
+            # Skipped frames still advance the cycle, so it stays in step with the clock
+            current_color = (current_color + frames) % len(colors)
             self.header_label.configure(text_color=colors[current_color])
-            current_color = (current_color + 1) % 3
-            self.root.after(800, update_color)  # Slightly faster animation
         
-        update_color()
+        self.header_label.configure(text_color=colors[current_color])
+        self.frame_clock.add(update_color, HEADER_FRAME_MS)
 
     def create_glass_effect_content(self):
         content_frame = ctk.CTkFrame(
@@ -184,18 +284,6 @@ class HousePricePredictionApp:
             shadow.place(relx=0, rely=1.0, relwidth=1.0, anchor='sw')
             return frame
 
-        # Update the labels in create_glass_effect_content method
-        label_texts = {
-            'Square_Footage': 'Square Footage (sq ft) ',
-            'Bedrooms': 'Bedrooms       (1-5)',
-            'Bathrooms': 'No. of Bathrooms (1-4)',
-            'Location_Rating': 'Location Rating (1-10)',
-            'Floor_Number': 'Floor Number (1-20)',
-            'Parking_Spots': 'No. of Parking Spots (0-2)',
-            'Swimming_Pool': 'Swimming Pool (0/1)',
-            'Security_Rating': 'Security Rating (1-10)'
-        }
-
         # Create input fields in grid layout with fixed positions
         field_positions = {
             'Square_Footage': (0, 0),
@@ -217,7 +305,7 @@ class HousePricePredictionApp:
             # Rest of the input field creation code remains the same
             # Label with icon
             icon = self.get_feature_icon(feature)
-            label_text = f"{icon} {label_texts.get(feature, feature)}"
+            label_text = f"{icon} {FEATURE_SPECS[feature].display_label()}"
             
             label = tk.Label(
                 frame,
@@ -274,7 +362,7 @@ class HousePricePredictionApp:
         button_frame.pack(pady=20)
         
         # Make buttons responsive
-        button_frame.grid_columnconfigure((0,1,2), weight=1)
+        button_frame.grid_columnconfigure((0,1,2,3,4), weight=1)
 
         # Styled buttons with grid layout
         calculate_btn = self.create_styled_button(
@@ -301,29 +389,69 @@ class HousePricePredictionApp:
         )
         save_btn.grid(row=0, column=2, padx=10)
 
+        whatif_btn = self.create_styled_button(
+            button_frame,
+            "📈 What-if",
+            self.show_sensitivity_sweep,
+            self.style['highlight']
+        )
+        whatif_btn.grid(row=0, column=3, padx=10)
+
+        sale_btn = self.create_styled_button(
+            button_frame,
+            "🏷️ Record Sale",
+            self.record_sale,
+            self.style['success']
+        )
+        sale_btn.grid(row=0, column=4, padx=10)
+
+        # Status line for validation errors and the model warm-up state
+        self.result_label = tk.Label(
+            prediction_frame,
+            text=("Enter property details and click Calculate" if self.predictor is not None
+                  else "⏳ Model warming up..."),
+            font=("Helvetica", 12),
+            fg=self.style['text_primary'],
+            bg=self.style['bg_secondary']
+        )
+        self.result_label.pack(pady=(0, 15))
+
     def predict_price(self):
+        if self.predictor is None:
+            # Training is still running; answer this click as soon as the model is ready
+            self._prediction_queued = True
+            self.result_label.configure(
+                text="⏳ Model warming up, your valuation will appear shortly",
+                fg=self.style['text_primary']
+            )
+            return
+
         try:
-            # Validate and collect inputs
-            input_values = []
-            for feature, var in self.features.items():
-                value = var.get().strip()
-                if not value:
-                    raise ValueError(f"Please enter a value for {feature}")
-                try:
-                    float_value = float(value)
-                    if float_value < 0:
-                        raise ValueError(f"{feature} cannot be negative")
-                    input_values.append(float_value)
-                except ValueError:
-                    raise ValueError(f"Please enter a valid number for {feature}")
-
-            # Scale input and predict
-            input_scaled = self.scaler.transform(np.array([input_values]))
-            prediction = self.model.predict(input_scaled)[0]
+            # Validate and collect inputs against the feature schema, reporting every
+            # problem at once
+            with instrumentation.timer('predict_price.parse'):
+                input_values, errors = parse_inputs(var.get() for var in self.features.values())
+            if errors:
+                raise ValueError('\n'.join(message for _, message in errors))
+
+            # Price, range and comparables are cached together, so a repeat valuation
+            # skips all three
+            with instrumentation.timer('predict_price.value'):
+                prediction, interval, comparables = self.valuation_cache.get_or_compute(
+                    input_values, self._value
+                )
+
+            # Every valuation goes to the history; this only enqueues, the disk write
+            # happens on the history's writer thread
+            with instrumentation.timer('predict_price.save'):
+                self.last_estimate = (input_values, prediction)
+                self._last_estimate_saved = False
+                self.save_estimate(announce=False)
 
             # Format prediction
-            formatted_price = self.format_indian_currency(prediction)
-            self.show_result_popup(formatted_price)
+            with instrumentation.timer('predict_price.format'):
+                formatted_price = self.format_indian_currency(prediction)
+            self.show_result_popup(formatted_price, interval, comparables)
 
         except Exception as e:
             self.result_label.configure(
@@ -331,30 +459,212 @@ class HousePricePredictionApp:
                 fg='red'
             )
 
-    def format_indian_currency(self, amount):
-        amount = abs(int(amount))
-        s = str(amount)
-        l = len(s)
-        if l > 7:
-            crores = s[:-7]
-            remaining = s[-7:]
-            formatted = crores + ',' + remaining[:2] + ',' + remaining[2:4] + ',' + remaining[4:]
-        elif l > 5:
-            lakhs = s[:-5]
-            remaining = s[-5:]
-            formatted = lakhs + ',' + remaining[:2] + ',' + remaining[2:]
-        elif l > 3:
-            formatted = s[:-3] + ',' + s[-3:]
+    def _value(self, models, values):
+        # One uncached valuation with the models current when it started
+        predictor, ensemble, comparables = models
+        # For linear models the scaler and model are folded into one weight vector, so
+        # this is a plain dot product (transform and predict in one stage)
+        with instrumentation.timer('predict_price.predict'):
+            prediction = predictor.predict_scalar(values)
+        # All replicas priced in one matrix-vector product
+        with instrumentation.timer('predict_price.interval'):
+            interval = None if ensemble is None else ensemble.interval_row(values)
+        # One k-nearest lookup in the KD-tree over the scaled training rows
+        with instrumentation.timer('predict_price.comparables'):
+            nearest = None if comparables is None else comparables.nearest(values, COMPARABLE_COUNT)
+        return prediction, interval, nearest
+
+    def _reset_valuations(self):
+        # Called whenever the model, the bootstrap ensemble or the comparables index
+        # changes; cached valuations from the old set are dropped
+        self.valuation_cache.set_predictor((self.predictor, self.ensemble, self.comparables))
+
+    def current_inputs(self):
+        # Entered values, with the schema default standing in for anything blank or invalid
+        values = []
+        for feature, var in self.features.items():
+            spec = FEATURE_SPECS[feature]
+            try:
+                value = float(var.get().strip())
+            except ValueError:
+                value = None
+            if value is None or spec.check(value) is not None:
+                value = float(spec.default)
+            values.append(value)
+        return values
+
+    def show_sensitivity_sweep(self):
+        if self.predictor is None:
+            self.result_label.configure(
+                text="⏳ Model warming up, try the what-if chart in a moment",
+                fg=self.style['text_primary']
+            )
+            return
+        # The window and its figure are built once and only hidden on close
+        if self.sweep_window is None:
+            self._build_sweep_window()
         else:
-            formatted = s
-        return formatted
+            self.sweep_window.deiconify()
+            self.sweep_window.lift()
+        self._refresh_sweep()
+
+    def _build_sweep_window(self):
+        window = tk.Toplevel(self.root)
+        window.title("What-if Price Sensitivity")
+        window.geometry("800x620")
+        window.configure(bg=self.style['bg_primary'])
+        window.protocol('WM_DELETE_WINDOW', window.withdraw)
+        self.sweep_window = window
+
+        controls = tk.Frame(window, bg=self.style['bg_primary'])
+        controls.pack(fill='x', padx=20, pady=15)
 
-    def show_result_popup(self, formatted_price):
+        features = list(self.features)
+        self.sweep_x = tk.StringVar(value='Square_Footage')
+        self.sweep_y = tk.StringVar(value='None')
+        self.sweep_held = tk.StringVar(value='Location_Rating')
+        menus = [
+            ("Sweep", self.sweep_x, features),
+            ("Against", self.sweep_y, ['None'] + features),
+            ("Slider", self.sweep_held, features)
+        ]
+        for column, (text, variable, values) in enumerate(menus):
+            tk.Label(
+                controls,
+                text=text,
+                font=("Helvetica", 11, "bold"),
+                fg=self.style['label_text'],
+                bg=self.style['bg_primary']
+            ).grid(row=0, column=column, sticky='w', padx=5)
+            ctk.CTkOptionMenu(
+                controls,
+                values=values,
+                variable=variable,
+                command=lambda _: self._refresh_sweep(),
+                fg_color=self.style['input_bg'],
+                button_color=self.style['accent']
+            ).grid(row=1, column=column, padx=5)
+
+        self.sweep_slider = ctk.CTkSlider(
+            controls,
+            from_=0,
+            to=1,
+            command=self._on_sweep_slider,
+            button_color=self.style['accent']
+        )
+        self.sweep_slider.grid(row=1, column=3, padx=10, sticky='ew')
+        self.sweep_slider_label = tk.Label(
+            controls,
+            font=("Helvetica", 11),
+            fg=self.style['text_secondary'],
+            bg=self.style['bg_primary']
+        )
+        self.sweep_slider_label.grid(row=0, column=3, sticky='w', padx=10)
+        controls.grid_columnconfigure(3, weight=1)
+
+        self.sweep_chart = SensitivityChart(
+            window,
+            facecolor=self.style['bg_secondary'],
+            accent=self.style['accent'],
+            text_color=self.style['text_primary']
+        )
+        self.sweep_chart.widget.pack(fill='both', expand=True, padx=20, pady=(0, 20))
+
+    def _refresh_sweep(self):
+        # A new sweep layout: rebuild the grid once, then let the chart decide whether
+        # its artists can be reused
+        feature_x = self.sweep_x.get()
+        feature_y = None if self.sweep_y.get() in ('None', feature_x) else self.sweep_y.get()
+        held = self.sweep_held.get()
+        if held in (feature_x, feature_y):
+            held = next(f for f in self.features if f not in (feature_x, feature_y))
+            self.sweep_held.set(held)
+
+        base = self.current_inputs()
+        self.sweep_grid = SweepGrid(
+            base,
+            feature_x, sweep_values(feature_x),
+            feature_y, None if feature_y is None else sweep_values(feature_y, 40)
+        )
+        low, high, _ = SWEEP_RANGES[held]
+        self.sweep_slider.configure(from_=low, to=high)
+        self.sweep_slider.set(base[list(self.features).index(held)])
+        self._on_sweep_slider(self.sweep_slider.get())
+
+    def _on_sweep_slider(self, value):
+        # Called continuously while dragging: one column write, one vectorized
+        # predict and a blit of the existing artists
+        held = self.sweep_held.get()
+        self.sweep_slider_label.configure(text=f"{held.replace('_', ' ')}: {value:.1f}")
+        self.sweep_grid.set_value(held, value)
+        self.sweep_chart.show(self.sweep_grid, self.sweep_grid.evaluate(self.predictor))
+
+    def format_indian_currency(self, amount):
+        # One formatter for every price the app shows, so the headline price, the range
+        # and the comparables always group (and sign) the same way
+        return format_indian_currency(amount)
+
+    def show_result_popup(self, formatted_price, interval=None, comparables=None):
+        # The popup is built once; later valuations refill its widgets in place and
+        # closing only hides it, so repeated valuations create no new windows
+        show_start = time.perf_counter()
+        if self.result_popup is None:
+            self._build_result_popup()
+        popup = self.result_popup
+
+        # Optional rows are re-packed in order inside their own frame, so the card's
+        # layout never changes
+        self.range_label.pack_forget()
+        self.comparables_frame.pack_forget()
+        if interval is not None:
+            low, high = interval
+            self.range_label.configure(
+                text=f"{DEFAULT_LEVEL:.0%} range: ₹ {format_indian_currency(low)} – ₹ {format_indian_currency(high)}"
+            )
+            self.range_label.pack(pady=(0, 20))
+        for label in self.comparable_labels:
+            label.pack_forget()
+        if comparables:
+            for label, (_, features, price) in zip(self.comparable_labels, comparables):
+                label.configure(text=f"{self.describe_property(features)}   ₹ {format_indian_currency(price)}")
+                label.pack()
+            self.comparables_frame.pack()
+        size = "600x680" if comparables else "600x500"
+        if size != self._popup_size:
+            popup.geometry(size)
+            self._popup_size = size
+
+        if not self._popup_placed:
+            # Centred once; afterwards it reopens wherever the user left it
+            self.root.eval(f'tk::PlaceWindow {str(popup)} center')
+            self._popup_placed = True
+            self._popup_visible = False
+        if not self._popup_visible:
+            # Not modal: the main window stays usable, and a valuation made while the
+            # popup is open updates it in place
+            popup.deiconify()
+            self._popup_visible = True
+            # A freshly opened popup counts up from zero
+            self._price_shown = 0
+        popup.lift()
+        self._animate_price_to(int(formatted_price.replace(',', '')))
+        if instrumentation.enabled:
+            instrumentation.observe('popup.show', time.perf_counter() - show_start)
+
+    def _build_result_popup(self):
+        build_start = time.perf_counter()
         popup = tk.Toplevel(self.root)
+        popup.withdraw()
         popup.title("Property Valuation Result")
-        popup.geometry("600x500")
         popup.configure(bg=self.style['bg_primary'])
-        
+        popup.transient(self.root)
+        popup.protocol('WM_DELETE_WINDOW', self.hide_result_popup)
+        popup.bind('<Escape>', lambda e: self.hide_result_popup())
+        self.result_popup = popup
+        self._popup_size = None
+        self._popup_placed = False
+        self._popup_visible = False
+
         # Create 3D card effect
         result_frame = ctk.CTkFrame(
             popup,
@@ -362,68 +672,134 @@ class HousePricePredictionApp:
             corner_radius=15
         )
         result_frame.pack(expand=True, fill='both', padx=40, pady=40)
-        
+
+        ctk.CTkLabel(
+            result_frame,
+            text="Estimated Property Price",
+            font=("Helvetica", 24, "bold"),
+            text_color=self.style['accent']
+        ).pack(pady=(30, 0))
+
         # Animated price reveal
-        price_label = ctk.CTkLabel(
+        self.price_label = ctk.CTkLabel(
             result_frame,
             text="₹ 0",
             font=("Helvetica", 48, "bold"),
             text_color=self.style['accent']
         )
-        price_label.pack(pady=40)
-        
-        def animate_price(current=0, target=int(formatted_price.replace(',', ''))):
-            if current < target:
-                next_val = min(current + (target // 20), target)
-                price_label.configure(text=f"₹ {self.format_indian_currency(next_val)}")
-                popup.after(50, lambda: animate_price(next_val, target))
-        
-        animate_price()
-        
+        self.price_label.pack(pady=30)
+
+        details = ctk.CTkFrame(result_frame, fg_color='transparent')
+        details.pack()
+        self.range_label = ctk.CTkLabel(
+            details,
+            font=("Helvetica", 16),
+            text_color=self.style['text_primary']
+        )
+        self.comparables_frame = ctk.CTkFrame(details, fg_color='transparent')
+        ctk.CTkLabel(
+            self.comparables_frame,
+            text="Comparable properties",
+            font=("Helvetica", 16, "bold"),
+            text_color=self.style['text_primary']
+        ).pack()
+        self.comparable_labels = [
+            ctk.CTkLabel(
+                self.comparables_frame,
+                font=("Helvetica", 12),
+                text_color=self.style['text_secondary']
+            )
+            for _ in range(COMPARABLE_COUNT)
+        ]
+
         # Modern close button
-        close_btn = ctk.CTkButton(
+        ctk.CTkButton(
             result_frame,
             text="Close",
-            command=popup.destroy,
+            command=self.hide_result_popup,
             fg_color=self.style['highlight'],
             hover_color=self.style['accent_light'],
             corner_radius=10,
             height=40
-        )
-        close_btn.pack(pady=20)
+        ).pack(pady=20)
+        if instrumentation.enabled:
+            instrumentation.observe('popup.build', time.perf_counter() - build_start)
 
-        # Center the popup
-        popup.transient(self.root)
-        popup.grab_set()
-        self.root.eval(f'tk::PlaceWindow {str(popup)} center')
+    def hide_result_popup(self):
+        if self._price_animation is not None:
+            self.frame_clock.remove(self._price_animation)
+            self._price_animation = None
+        self.result_popup.withdraw()
+        self._popup_visible = False
 
-        # Result display
-        tk.Label(
-            popup,
-            text="Estimated Property Price",
-            font=("Helvetica", 24, "bold"),
-            fg=self.style['accent'],
-            bg=self.style['bg_primary']
-        ).pack(pady=20)
+    def _animate_price_to(self, target):
+        # Count from whatever is showing towards target in about 20 frames. A count
+        # still in flight is retargeted rather than a second one started.
+        self._price_target = target
+        self._price_step = max(abs(target - self._price_shown) // 20, 1)
+        if self._price_animation not in self.frame_clock.animations:
+            self._price_animation = None
+            if self._price_shown != target:
+                self._price_animation = self.frame_clock.add(self._step_price, PRICE_FRAME_MS, delay_ms=0)
+            else:
+                self.price_label.configure(text=f"₹ {self.format_indian_currency(target)}")
 
-        tk.Label(
-            popup,
-            text=f"₹ {formatted_price}",
-            font=("Helvetica", 36, "bold"),
-            fg=self.style['accent'],
-            bg=self.style['bg_primary']
-        ).pack(pady=20)
+    def _step_price(self, frames):
+        with instrumentation.timer('popup.frame'):
+            remaining = self._price_target - self._price_shown
+            move = min(abs(remaining), self._price_step * frames)
+            self._price_shown += move if remaining > 0 else -move
+            self.price_label.configure(text=f"₹ {self.format_indian_currency(self._price_shown)}")
+        if self._price_shown == self._price_target:
+            self._price_animation = None
+            return False
+        return True
 
-        tk.Button(
-            popup,
-            text="Close",
-            command=popup.destroy,
-            font=("Helvetica", 12, "bold"),
-            bg=self.style['accent'],
-            fg='white',
-            relief='flat',
-            cursor='hand2'
-        ).pack(pady=20)
+    def describe_property(self, features):
+        # One-line summary of a comparable, e.g. "2,150 sq ft · 3 bed · 2 bath · location 6.1 · floor 4"
+        return (f"{features['Square_Footage']:,.0f} sq ft · {features['Bedrooms']:.0f} bed · "
+                f"{features['Bathrooms']:.0f} bath · location {features['Location_Rating']:.1f} · "
+                f"floor {features['Floor_Number']:.0f}")
+
+    def _setup_instrumentation(self):
+        # Periodic export plus one at exit, and an F12 overlay with live latencies
+        atexit.register(instrumentation.export)
+        self.root.after(METRICS_EXPORT_MS, self._export_metrics)
+        self.metrics_overlay = None
+        self._overlay_animation = None
+        self.root.bind('<F12>', self.toggle_metrics_overlay)
+
+    def _export_metrics(self):
+        try:
+            instrumentation.export()
+        except OSError as e:
+            print(f"Could not export metrics: {e}", file=sys.stderr)
+        self.root.after(METRICS_EXPORT_MS, self._export_metrics)
+
+    def toggle_metrics_overlay(self, event=None):
+        if self.metrics_overlay is not None:
+            self.frame_clock.remove(self._overlay_animation)
+            self.metrics_overlay.destroy()
+            self.metrics_overlay = None
+            return
+        self.metrics_overlay = tk.Label(
+            self.root,
+            font=("Courier", 10),
+            justify='left',
+            fg=self.style['border'],
+            bg=self.style['bg_secondary']
+        )
+        self.metrics_overlay.place(relx=1.0, rely=1.0, anchor='se', x=-10, y=-10)
+        self._overlay_animation = self.frame_clock.add(
+            self._refresh_metrics_overlay, OVERLAY_REFRESH_MS, delay_ms=0
+        )
+
+    def _refresh_metrics_overlay(self, frames=1):
+        lines = instrumentation.summary_lines() or ["No timings recorded yet"]
+        clock = self.frame_clock.stats()
+        lines.append(f"frame clock: {clock['animations']} animations, {clock['ticks']} ticks, "
+                     f"{clock['dropped']} dropped frames")
+        self.metrics_overlay.configure(text='\n'.join(lines))
 
     def create_styled_button(self, parent, text, command, color):
         frame = ctk.CTkFrame(parent, fg_color="transparent")
@@ -477,49 +853,181 @@ class HousePricePredictionApp:
             fg=self.style['text_primary']
         )
 
-    def save_estimate(self):
-        # Placeholder for save functionality
-        pass
-
-        def initialize_model(self):
-        # Generate sample data based on Delhi real estate market
-            np.random.seed(42)
-        n_samples = 1000
-
-        square_footage = np.random.uniform(500, 4000, n_samples)
-        bedrooms = np.random.randint(1, 6, n_samples)
-        bathrooms = np.random.randint(1, 5, n_samples)
-        location_rating = np.random.uniform(1, 10, n_samples)
-        floor_number = np.random.randint(1, 20, n_samples)
-        parking_spots = np.random.randint(0, 3, n_samples)
-        swimming_pool = np.random.randint(0, 2, n_samples)
-        security_rating = np.random.uniform(1, 10, n_samples)
-
-        X = np.column_stack([
-            square_footage, bedrooms, bathrooms, location_rating,
-            floor_number, parking_spots, swimming_pool, security_rating
-        ])
-
-        base_price_per_sqft = 12000
-
-        y = (
-            square_footage * base_price_per_sqft +
-            bedrooms * 1000000 +
-            bathrooms * 800000 +
-            location_rating * 500000 +
-            parking_spots * 300000 +
-            swimming_pool * 1000000 +
-            security_rating * 250000 +
-            floor_number * 50000 +
-            np.random.normal(0, 5000000, n_samples)
+    def save_estimate(self, announce=True):
+        if self.last_estimate is None:
+            if announce:
+                self.result_label.configure(text="Calculate a valuation before saving", fg='red')
+            return
+        if not self._last_estimate_saved:
+            if self.estimate_history is None:
+                # Created on first use; the database is opened on its writer thread
+                self.estimate_history = EstimateHistory()
+                atexit.register(self.estimate_history.close)
+            input_values, prediction = self.last_estimate
+            self.estimate_history.record(input_values, prediction, self.model_version)
+            self._last_estimate_saved = True
+        if announce:
+            self.result_label.configure(text="💾 Estimate saved to history", fg=self.style['success'])
+
+    def record_sale(self):
+        # Fold the actual sale price of the entered property into the model
+        if self.predictor is None:
+            self.result_label.configure(
+                text="⏳ Model warming up, record the sale in a moment",
+                fg=self.style['text_primary']
+            )
+            return
+        input_values, errors = parse_inputs(var.get() for var in self.features.values())
+        if errors:
+            self.result_label.configure(text='\n'.join(message for _, message in errors), fg='red')
+            return
+        price = simpledialog.askfloat(
+            "Record Sale",
+            "Actual sale price (₹) for the entered property:",
+            minvalue=1,
+            parent=self.root
         )
+        if price is None:
+            return
+
+        self._submit_online(self._fold_sale, input_values, price)
+        self.result_label.configure(text="🏷️ Updating the model with the recorded sale...",
+                                    fg=self.style['text_primary'])
+
+    def _submit_online(self, fn, *args):
+        # Online refits run on their own worker thread; the Tk loop only swaps in the result
+        if self._online_executor is None:
+            self._online_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='online')
+        self._sale_futures.append(self._online_executor.submit(fn, *args))
+        if len(self._sale_futures) == 1:
+            self.root.after(MODEL_POLL_MS, self._check_sale_recorded)
+
+    def _open_online_model(self):
+        # Worker thread. Built from the training rows plus every sale recorded in earlier
+        # runs, which from_params replays from the sales log.
+        if self.online_model is None:
+            from online_model import OnlineModel
+            self.online_model = OnlineModel.from_params(
+                self._model_params, decay=ONLINE_DECAY, sales_path=DEFAULT_SALES_PATH
+            )
+        online = self.online_model
+        return online.scaler, online.model, online.predictor, online.n_sales
+
+    def _fold_sale(self, input_values, price):
+        self._open_online_model()
+        self.online_model.update([input_values], [price])
+        return self._open_online_model()
+
+    def _check_sale_recorded(self):
+        while self._sale_futures and self._sale_futures[0].done():
+            future = self._sale_futures.pop(0)
+            try:
+                scaler, model, predictor, sales = future.result()
+            except Exception as e:
+                self.result_label.configure(text=f"Could not update the model from recorded sales: {e}", fg='red')
+                continue
+            if not sales:
+                continue
+            # Predictors are immutable, so swapping the reference is the whole update;
+            # the bootstrap range stays the one fitted at startup
+            self.scaler, self.model, self.predictor = scaler, model, predictor
+            self._reset_valuations()
+            self.model_version = f"{self._base_model_version}+online{sales}"
+            self.result_label.configure(
+                text=f"🏷️ Model updated with {sales} recorded sale{'s' if sales != 1 else ''}",
+                fg=self.style['success']
+            )
+            if self.sweep_window is not None and self.sweep_window.winfo_viewable():
+                self._refresh_sweep()
+        if self._sale_futures:
+            self.root.after(MODEL_POLL_MS, self._check_sale_recorded)
+
+    def initialize_model(self):
+        # Reuse the persisted scaler and model; only retrain when the data parameters
+        # or the feature schema change. This runs on a worker thread so the window
+        # appears immediately; the Tk loop polls the future and picks up the result.
+        self.scaler = self.model = self.predictor = None
+        self.valuation_cache = PredictionCache()
+        self._prediction_queued = False
+        # Set from the loaded model's parameters once it is ready
+        self._model_params = None
+        self.model_version = self._base_model_version = None
+        self.online_model = None
+        self._online_executor = None
+        self._sale_futures = []
+        self.estimate_history = None
+        self.last_estimate = None
+        self._last_estimate_saved = False
+        self.ensemble = None
+        feature_names = list(self.features)
+        self._model_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='model')
+        self.model_future = self._model_executor.submit(_load_model, feature_names)
+        # Queued behind the model so the first valuation is never held up by it
+        self.ensemble_future = None
+        if BOOTSTRAP_REPLICAS:
+            self.ensemble_future = self._model_executor.submit(_load_ensemble, feature_names)
+        # The comparables index is loaded (or built and saved) last on the same worker
+        self.comparables = None
+        self.comparables_future = None
+        if COMPARABLE_COUNT:
+            self.comparables_future = self._model_executor.submit(_load_comparables, feature_names)
+        self.root.after(MODEL_POLL_MS, self._check_model_ready)
+        return self.model_future
+
+    def _check_model_ready(self):
+        # Runs on the Tk main thread, so it is safe to touch widgets here
+        if not self.model_future.done():
+            self.root.after(MODEL_POLL_MS, self._check_model_ready)
+            return
+        self._model_executor.shutdown(wait=False)
 
-        # Split, scale, and train
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-        self.scaler = StandardScaler()
-        X_train_scaled = self.scaler.fit_transform(X_train)
-        self.model = LinearRegression()
-        self.model.fit(X_train_scaled, y_train)
+        try:
+            scaler, model, predictor, params, version = self.model_future.result()
+        except Exception as e:
+            self.result_label.configure(text=f"Model failed to load: {e}", fg='red')
+            return
+        self.scaler, self.model, self.predictor = scaler, model, predictor
+        self._model_params = params
+        self.model_version = self._base_model_version = version
+        self._reset_valuations()
+        if self.ensemble_future is not None:
+            self.root.after(MODEL_POLL_MS, self._check_ensemble_ready)
+        if self.comparables_future is not None:
+            self.root.after(MODEL_POLL_MS, self._check_comparables_ready)
+        # Sales recorded before a restart are folded back in straight away
+        if params['model'] == 'linear' and os.path.exists(DEFAULT_SALES_PATH):
+            self._submit_online(self._open_online_model)
+
+        if self._prediction_queued:
+            self._prediction_queued = False
+            self.predict_price()
+        else:
+            self.result_label.configure(
+                text="Enter property details and click Calculate",
+                fg=self.style['text_primary']
+            )
+
+    def _check_ensemble_ready(self):
+        if not self.ensemble_future.done():
+            self.root.after(MODEL_POLL_MS, self._check_ensemble_ready)
+            return
+        try:
+            self.ensemble = self.ensemble_future.result()
+        except ValueError:
+            # Only linear models can be bootstrapped this way; show point estimates
+            self.ensemble = None
+        self._reset_valuations()
+
+    def _check_comparables_ready(self):
+        if not self.comparables_future.done():
+            self.root.after(MODEL_POLL_MS, self._check_comparables_ready)
+            return
+        try:
+            self.comparables = self.comparables_future.result()
+        except (OSError, ValueError):
+            # e.g. out-of-core training keeps no rows to index; valuations work without it
+            self.comparables = None
+        self._reset_valuations()
 
     def smooth_scroll(self, *args):
         # Smooth scrolling implementation
@@ -527,24 +1035,56 @@ class HousePricePredictionApp:
         self.root.update_idletasks()
 
     def create_gradient_background(self, width, height):
-        gradient_canvas = tk.Canvas(
-            self.root,
-            width=width,
-            height=height,
-            highlightthickness=0
+        colors = (self.style['gradient_start'], self.style['gradient_end'])
+        key = (width, height, colors)
+        photo = self._gradient_cache.get(key)
+        if photo is None:
+            photo = ImageTk.PhotoImage(render_gradient(width, height, colors))
+            self._gradient_cache[key] = photo
+            if len(self._gradient_cache) > GRADIENT_CACHE_SIZE:
+                self._gradient_cache.popitem(last=False)
+        else:
+            self._gradient_cache.move_to_end(key)
+
+        # A single canvas item whatever the window size, instead of one line per row
+        if self._gradient_item is None:
+            self._gradient_item = self.main_canvas.create_image(0, 0, anchor='nw', image=photo)
+            self.main_canvas.tag_lower(self._gradient_item)
+        else:
+            self.main_canvas.itemconfigure(self._gradient_item, image=photo)
+
+    def on_window_resize(self, event):
+        # Only the root window's own resizes; its children report <Configure> here too
+        if event.widget is not self.root:
+            return
+        # Debounce: a drag-resize fires hundreds of events, only the last one matters
+        if self._resize_job is not None:
+            self.root.after_cancel(self._resize_job)
+        self._resize_job = self.root.after(RESIZE_DEBOUNCE_MS, self.update_responsive_layout)
+
+    def update_responsive_layout(self):
+        self._resize_job = None
+        window_width, window_height = self.root.winfo_width(), self.root.winfo_height()
+        if window_width <= 1 or window_height <= 1:
+            return
+
+        # Fonts and padding are only touched when their values actually change
+        header_font_size = min(42, int(window_width / 30))
+        if header_font_size != self._header_font_size:
+            self._header_font_size = header_font_size
+            self.header_font.configure(size=header_font_size)
+        padding = (int(window_width * 0.05), int(window_height * 0.03))
+        if padding != self._padding:
+            self._padding = padding
+            self.main_container.pack_configure(padx=padding[0], pady=padding[1])
+
+        bucket = (
+            -(-window_width // BACKGROUND_BUCKET_PX) * BACKGROUND_BUCKET_PX,
+            -(-window_height // BACKGROUND_BUCKET_PX) * BACKGROUND_BUCKET_PX
         )
-        gradient_canvas.place(x=0, y=0, relwidth=1, relheight=1)
-        
-        # Reduce number of gradient lines for better performance
-        step = 2  # Increase step size for faster rendering
-        for i in range(0, height, step):
-            ratio = i / height
-            color = self.interpolate_color(
-                self.style['gradient_start'],
-                self.style['gradient_end'],
-                ratio
-            )
-            gradient_canvas.create_line(0, i, width, i, fill=color)
+        if bucket != self._background_bucket:
+            self._background_bucket = bucket
+            self.create_gradient_background(*bucket)
 
     def interpolate_color(self, color1, color2, ratio):
         # Fast color interpolation
@@ -560,26 +1100,3 @@ if __name__ == "__main__":
     root = tk.Tk()
     app = HousePricePredictionApp(root)
     root.mainloop()
-
-    # Add resize handler
-    self.root.bind('<Configure>', self.on_window_resize)
-
-    def on_window_resize(self, event):
-        # Only handle window resize events
-        if event.widget == self.root:
-            # Update font sizes and layouts
-            header_font_size = min(42, int(self.root.winfo_width() / 30))
-            self.header_label.configure(font=("Helvetica", header_font_size, "bold"))
-            
-            # Update other responsive elements as needed
-            self.update_responsive_layout()
-
-    def update_responsive_layout(self):
-        # Update padding and margins
-        window_width = self.root.winfo_width()
-        window_height = self.root.winfo_height()
-        
-        self.main_container.pack_configure(
-            padx=int(window_width * 0.05),
-            pady=int(window_height * 0.03)
-        )
\ No newline at end of file
@@ -0,0 +1,183 @@
+import argparse
+import csv
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from bootstrap import DEFAULT_LEVEL
+from currency import format_indian_currency_array
+from feature_schema import ValidationError, default_validator
+from house_model import FEATURES, make_predictor
+from model_store import load_or_build_comparables, load_or_train, load_or_train_ensemble
+
+# 0-based data row of the input each output row came from, numbered like the
+# invalid-row report, so output still lines up with the input when rows are skipped
+ROW_COLUMN = 'Input_Row'
+PREDICTION_COLUMN = 'Predicted_Price'
+FORMATTED_COLUMN = 'Predicted_Price_INR'
+LOW_COLUMN = 'Predicted_Low'
+HIGH_COLUMN = 'Predicted_High'
+COMPARABLES_COLUMN = 'Comparables_Median_Price'
+DISTANCE_COLUMN = 'Nearest_Comparable_Distance'
+
+
+def predict_csv(input_path, output_path, chunk_size=100000, scaler=None, model=None,
+                keep_columns=False, progress=None, format_inr=False, ensemble=None, level=DEFAULT_LEVEL,
+                on_invalid='error', invalid_report=None, comparables=None, n_comparables=5):
+    # Stream the CSV in fixed-size chunks so memory stays flat whatever the file size.
+    # With a bootstrap ensemble, every row also gets the bounds of its `level` interval;
+    # with a comparables index, the median price of its n_comparables nearest training
+    # rows and the distance to the nearest one.
+    # Rows that break the feature schema stop the run (on_invalid='error'), are left out
+    # ('skip') or are priced anyway ('keep'); invalid_report, if given, is a CSV path
+    # that receives every violating (row, column) whatever the mode. 'error' stops
+    # predicting at the first bad block but still checks the rest of the file, so the
+    # report and the error cover every invalid row.
+    if on_invalid not in ('error', 'skip', 'keep'):
+        raise ValueError(f"on_invalid must be 'error', 'skip' or 'keep', not {on_invalid!r}")
+    if scaler is None or model is None:
+        scaler, model = load_or_train()
+    predictor = make_predictor(scaler, model)
+
+    reader = pd.read_csv(
+        input_path,
+        chunksize=chunk_size,
+        usecols=None if keep_columns else FEATURES,
+        dtype={feature: np.float64 for feature in FEATURES}
+    )
+
+    rows = 0
+    invalid = 0
+    first_invalid = None
+    written = False
+    start = time.perf_counter()
+    out = sys.stdout if output_path == '-' else open(output_path, 'w', newline='')
+    report_file = None if invalid_report is None else open(invalid_report, 'w', newline='')
+    try:
+        if report_file is not None:
+            report_writer = csv.writer(report_file)
+            report_writer.writerow(['row', 'column', 'value', 'reason'])
+        for chunk in reader:
+            missing = [feature for feature in FEATURES if feature not in chunk.columns]
+            if missing:
+                raise ValueError(f"Input is missing columns: {', '.join(missing)}")
+
+            X = chunk[FEATURES].to_numpy(dtype=np.float64)
+            # The whole block is checked with a few vectorized comparisons
+            report = default_validator.validate(X, row_offset=rows)
+            rows += len(chunk)
+            if not report.ok:
+                invalid += report.invalid_rows.size
+                first_invalid = first_invalid or report
+                if report_file is not None:
+                    report_writer.writerows(report.violations())
+                if on_invalid == 'skip':
+                    valid = ~report.mask.any(axis=1)
+                    chunk, X = chunk[valid], X[valid]
+            if on_invalid == 'error' and first_invalid is not None:
+                continue
+
+            # One fused matrix-vector product per block instead of per row
+            predictions = predictor.predict(X)
+
+            result = chunk if keep_columns else pd.DataFrame(index=chunk.index)
+            # The reader numbers rows continuously across chunks, and skipping keeps that index
+            result.insert(0, ROW_COLUMN, chunk.index)
+            result[PREDICTION_COLUMN] = predictions
+            if format_inr:
+                result[FORMATTED_COLUMN] = format_indian_currency_array(predictions)
+            if ensemble is not None:
+                low, high = ensemble.interval(X, level)
+                result[LOW_COLUMN] = low
+                result[HIGH_COLUMN] = high
+                if format_inr:
+                    result[LOW_COLUMN + '_INR'] = format_indian_currency_array(low)
+                    result[HIGH_COLUMN + '_INR'] = format_indian_currency_array(high)
+            if comparables is not None:
+                # One bulk k-nearest query per block
+                distances, prices = comparables.neighbour_prices(X, n_comparables)
+                result[COMPARABLES_COLUMN] = np.median(prices, axis=1)
+                result[DISTANCE_COLUMN] = distances[:, 0]
+            result.to_csv(out, header=not written, index=False)
+            written = True
+
+            if progress is not None:
+                progress(rows, time.perf_counter() - start)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if report_file is not None:
+            report_file.close()
+
+    if on_invalid == 'error' and first_invalid is not None:
+        raise ValidationError(
+            first_invalid,
+            f"{invalid:,} of {rows:,} rows break the feature schema. First: {first_invalid.examples()}"
+        )
+
+    seconds = time.perf_counter() - start
+    return {
+        'rows': rows,
+        'invalid_rows': invalid,
+        'seconds': seconds,
+        'rows_per_second': rows / seconds if seconds > 0 else float('inf')
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Predict house prices for every row of a CSV file.")
+    parser.add_argument('input', help="input CSV with the eight feature columns ('-' for stdin)")
+    parser.add_argument('output', nargs='?', default='-', help="output CSV path (default: stdout)")
+    parser.add_argument('--chunk-size', type=int, default=100000, help="rows per block (default: 100000)")
+    parser.add_argument('--keep-columns', action='store_true', help="copy the input columns to the output")
+    parser.add_argument('--format-inr', action='store_true',
+                        help="add a lakh/crore formatted price column (e.g. 1,23,45,678)")
+    parser.add_argument('--intervals', type=int, default=0, metavar='N',
+                        help="add a prediction interval from N bootstrap replicas (e.g. 200)")
+    parser.add_argument('--level', type=float, default=DEFAULT_LEVEL, help="interval coverage (default: 0.9)")
+    parser.add_argument('--comparables', type=int, default=0, metavar='K',
+                        help="add the median price of the K most similar training properties")
+    parser.add_argument('--on-invalid', choices=['error', 'skip', 'keep'], default='error',
+                        help="what to do with rows outside the feature schema (default: error)")
+    parser.add_argument('--invalid-report', metavar='CSV', help="write every invalid row and column here")
+    parser.add_argument('--quiet', action='store_true', help="do not report progress on stderr")
+    args = parser.parse_args(argv)
+
+    def report(rows, seconds):
+        print(f"\r{rows:,} rows  {rows / max(seconds, 1e-9):,.0f} rows/s", end='', file=sys.stderr)
+
+    # Replicas are fitted in parallel worker processes, then cached next to the model
+    ensemble = load_or_train_ensemble(n_replicas=args.intervals) if args.intervals else None
+    comparables = load_or_build_comparables() if args.comparables else None
+    try:
+        stats = predict_csv(
+            sys.stdin if args.input == '-' else args.input,
+            args.output,
+            chunk_size=args.chunk_size,
+            keep_columns=args.keep_columns,
+            format_inr=args.format_inr,
+            ensemble=ensemble,
+            level=args.level,
+            comparables=comparables,
+            n_comparables=args.comparables,
+            on_invalid=args.on_invalid,
+            invalid_report=args.invalid_report,
+            progress=None if args.quiet else report
+        )
+    except ValidationError as e:
+        print(f"\n{e}", file=sys.stderr)
+        return 1
+    if not args.quiet:
+        print(file=sys.stderr)
+    if stats['invalid_rows']:
+        action = 'skipped' if args.on_invalid == 'skip' else 'priced anyway'
+        print(f"{stats['invalid_rows']:,} rows broke the feature schema and were {action}", file=sys.stderr)
+    print(f"Predicted {stats['rows']:,} rows in {stats['seconds']:.2f}s "
+          f"({stats['rows_per_second']:,.0f} rows/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
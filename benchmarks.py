@@ -0,0 +1,285 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from unittest import mock
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+TRAINING_SIZES = [1000, 10000, 100000, 1000000, 10000000]
+# Above this many rows initialize_model is benchmarked on the chunked, out-of-core path
+IN_MEMORY_LIMIT = 1000000
+WINDOW_SIZES = [(1024, 768), (1536, 864), (1920, 1080), (2560, 1440)]
+SAMPLE_ROW = ['1200', '3', '2', '7', '5', '1', '0', '8']
+
+
+def measure(fn, repeats=5, number=1):
+    # Median and best per-call time over `repeats` rounds of `number` calls
+    fn()
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        timings.append((time.perf_counter() - start) / number)
+    return {
+        'median_s': statistics.median(timings),
+        'min_s': min(timings),
+        'repeats': repeats,
+        'number': number
+    }
+
+
+class _Var:
+    # Stand-in for tk.StringVar so the app can be driven without a display
+    def __init__(self, value=''):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+class _HeadlessWidget:
+    # Accepts any Tk widget call and counts the canvas items created
+    def __init__(self, *args, **kwargs):
+        self.items = 0
+
+    def __getattr__(self, name):
+        def call(*args, **kwargs):
+            if name.startswith('create_'):
+                self.items += 1
+                return self.items
+            return None
+        return call
+
+
+@contextmanager
+def headless_app(store_dir):
+    # Build HousePricePredictionApp without running Tk: __init__ needs a display, so
+    # only the state the benchmarked methods touch is set up here
+    import HousePricePrediction as hpp
+    from house_model import FEATURES, make_predictor
+    from model_store import load_or_build_comparables, load_or_train, load_or_train_ensemble
+    from prediction_cache import PredictionCache
+    from estimate_history import EstimateHistory
+
+    app = hpp.HousePricePredictionApp.__new__(hpp.HousePricePredictionApp)
+    app.root = _HeadlessWidget()
+    app.style = {'gradient_start': '#000000', 'gradient_end': '#112240'}
+    app.features = {feature: _Var(value) for feature, value in zip(FEATURES, SAMPLE_ROW)}
+    app.result_label = _HeadlessWidget()
+    app.scaler, app.model = load_or_train(store_dir=store_dir)
+    app.predictor = make_predictor(app.scaler, app.model)
+    app.valuation_cache = PredictionCache()
+    app.model_version = 'benchmark'
+    app.estimate_history = EstimateHistory(os.path.join(store_dir, 'estimates.sqlite3'))
+    app.last_estimate = None
+    app.ensemble = load_or_train_ensemble(store_dir=store_dir, max_workers=1)
+    app.comparables = load_or_build_comparables(store_dir=store_dir)
+    app._reset_valuations()
+    app.show_result_popup = lambda formatted_price, interval=None, comparables=None: None
+    app.main_canvas = _HeadlessWidget()
+    app._gradient_cache = OrderedDict()
+    app._gradient_item = None
+
+    # PhotoImage needs a Tk interpreter; everything up to it (the NumPy/PIL render) is real
+    headless_imagetk = mock.Mock(PhotoImage=lambda image: image)
+    try:
+        with mock.patch.object(hpp, 'ImageTk', headless_imagetk):
+            yield app
+    finally:
+        app.estimate_history.close()
+
+
+def bench_cold_import(repeats):
+    # Fresh interpreter each round so nothing is already in sys.modules
+    def run():
+        subprocess.run([sys.executable, '-c', 'import HousePricePrediction'], cwd=HERE, check=True)
+    return measure(run, repeats=repeats)
+
+
+def bench_initialize_model(sizes, repeats):
+    from house_model import train_model
+
+    results = {}
+    for n in sizes:
+        params = {'n_samples': n}
+        if n > IN_MEMORY_LIMIT:
+            params['chunk_size'] = 100000
+        # Big sizes are slow enough that a single round is representative
+        rounds = repeats if n <= 100000 else 1
+        result = measure(lambda: train_model(params), repeats=rounds)
+        result['mode'] = 'streaming' if 'chunk_size' in params else 'in_memory'
+        results[str(n)] = result
+    return results
+
+
+def bench_predict_price(app, repeats):
+    # Same inputs every call, so after the first call this is the cache-hit path
+    cached = measure(app.predict_price, repeats=repeats, number=2000)
+
+    def uncached():
+        app._reset_valuations()
+        app.predict_price()
+    return {'cached': cached, 'uncached': measure(uncached, repeats=repeats, number=2000)}
+
+
+def bench_batch_inference(app, repeats, n_rows=1000000):
+    from house_model import generate_delhi_data
+
+    X, _ = generate_delhi_data(n_rows, seed=7)
+    results = {}
+    for name, fn in [
+        ('fused', lambda: app.predictor.predict(X)),
+        ('sklearn', lambda: app.model.predict(app.scaler.transform(X)))
+    ]:
+        result = measure(fn, repeats=repeats)
+        result['rows'] = n_rows
+        result['rows_per_second'] = n_rows / result['median_s']
+        results[name] = result
+    return results
+
+
+def bench_currency_formatting(app, repeats, n_values=1000000):
+    from currency import format_indian_currency_array
+
+    amounts = np.random.RandomState(11).uniform(0, 1e9, n_values)
+    loop_values = amounts[:n_values // 10]
+    results = {
+        'loop': measure(lambda: [app.format_indian_currency(v) for v in loop_values], repeats=repeats),
+        'vectorized': measure(lambda: format_indian_currency_array(amounts), repeats=repeats)
+    }
+    results['loop']['rows'] = len(loop_values)
+    results['vectorized']['rows'] = n_values
+    for result in results.values():
+        result['rows_per_second'] = result['rows'] / result['median_s']
+    return results
+
+
+def bench_rendering(app, repeats):
+    import HousePricePrediction as hpp
+
+    colors = (app.style['gradient_start'], app.style['gradient_end'])
+    results = {}
+    for width, height in WINDOW_SIZES:
+        size = f"{width}x{height}"
+        # Uncached render, i.e. the cost of a resize into a new size
+        results[f"render_gradient/{size}"] = measure(
+            lambda: hpp.render_gradient(width, height, colors), repeats=repeats, number=10
+        )
+        # Repeated redraw at the same size, served from the image cache
+        results[f"create_gradient_background/{size}"] = measure(
+            lambda: app.create_gradient_background(width, height), repeats=repeats, number=10
+        )
+    results['interpolate_color'] = measure(
+        lambda: app.interpolate_color('#0A192F', '#112240', 0.37), repeats=repeats, number=10000
+    )
+    return results
+
+
+# Benchmarks that drive the headless app, in run order
+HEADLESS_BENCHMARKS = ['predict_price', 'batch_inference', 'currency_formatting', 'rendering']
+BENCHMARKS = ['cold_import', 'initialize_model'] + HEADLESS_BENCHMARKS
+
+
+def run_benchmarks(sizes=TRAINING_SIZES, repeats=5, only=None):
+    # `only` names a subset of BENCHMARKS to run, e.g. ['predict_price']
+    selected = set(BENCHMARKS if not only else only)
+    results = {}
+    # Keep the benchmarked model store out of the real cache
+    with tempfile.TemporaryDirectory() as store_dir:
+        if 'cold_import' in selected:
+            results['cold_import'] = bench_cold_import(repeats)
+        if 'initialize_model' in selected:
+            results['initialize_model'] = bench_initialize_model(sizes, repeats)
+        if selected.intersection(HEADLESS_BENCHMARKS):
+            with headless_app(store_dir) as app:
+                if 'predict_price' in selected:
+                    results['predict_price'] = bench_predict_price(app, repeats)
+                if 'batch_inference' in selected:
+                    results['batch_inference'] = bench_batch_inference(app, repeats)
+                if 'currency_formatting' in selected:
+                    results['currency_formatting'] = bench_currency_formatting(app, repeats)
+                if 'rendering' in selected:
+                    results['rendering'] = bench_rendering(app, repeats)
+
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'processor': platform.processor()
+        },
+        'results': results
+    }
+
+
+def _flatten(results, prefix=''):
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict) and 'median_s' in value:
+            flat[name] = value['median_s']
+        elif isinstance(value, dict):
+            flat.update(_flatten(value, name + '.'))
+    return flat
+
+
+def compare(current, baseline, tolerance=0.2):
+    # Benchmarks whose median got slower than baseline by more than `tolerance`
+    now = _flatten(current['results'])
+    before = _flatten(baseline['results'])
+    regressions = []
+    for name, seconds in sorted(now.items()):
+        if name in before and seconds > before[name] * (1 + tolerance):
+            regressions.append((name, before[name], seconds))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark startup, training, inference and rendering.")
+    parser.add_argument('--output', default='bench_results.json', help="where to write the results JSON")
+    parser.add_argument('--baseline', help="results JSON to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed slowdown vs baseline (default 20%%)")
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--only', nargs='+', choices=BENCHMARKS, metavar='NAME',
+                        help=f"run only these benchmarks ({', '.join(BENCHMARKS)})")
+    parser.add_argument('--max-samples', type=int, default=TRAINING_SIZES[-1],
+                        help="largest n_samples for the initialize_model sweep")
+    args = parser.parse_args(argv)
+
+    sizes = [n for n in TRAINING_SIZES if n <= args.max_samples]
+    report = run_benchmarks(sizes, args.repeats, args.only)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    for name, seconds in _flatten(report['results']).items():
+        print(f"{name:55s} {seconds * 1000:12.3f} ms")
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        for name, before, after in regressions:
+            print(f"REGRESSION {name}: {before * 1000:.3f} ms -> {after * 1000:.3f} ms", file=sys.stderr)
+        if regressions:
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+
+from house_model import DEFAULT_DATA_PARAMS, FusedPredictor, create_model, is_linear_model, training_sample
+from valuation_defaults import DEFAULT_LEVEL, DEFAULT_REPLICAS
+
+# Replicas of a model trained on a large dataset are fitted on a sample of this many of
+# its training rows. Intervals from the sample are slightly wider than the full data
+# would give, never narrower.
+MAX_BOOTSTRAP_ROWS = 100000
+
+# Out-of-bag residuals kept from each replica; pooled, they describe the noise around the fit
+RESIDUALS_PER_REPLICA = 50
+
+# Rows priced per block in interval(), so rows x replicas never needs more than ~32 MB
+_BLOCK_VALUES = 1 << 22
+
+
+def _fit_replicas(X, y, seeds, model_name):
+    # Worker: one scaler + model per seed, each fitted on a resample of the rows with
+    # replacement and folded into a single weight vector and bias
+    n = len(y)
+    weights = np.empty((len(seeds), X.shape[1]))
+    biases = np.empty(len(seeds))
+    residuals = []
+    for i, seed in enumerate(seeds):
+        rng = np.random.RandomState(seed)
+        rows = rng.randint(0, n, n)
+        scaler = StandardScaler()
+        model = create_model(model_name)
+        model.fit(scaler.fit_transform(X[rows]), y[rows])
+        if not is_linear_model(model):
+            raise ValueError(f"Bootstrap intervals need a linear model, not {model_name!r}")
+        fused = FusedPredictor.from_pipeline(scaler, model)
+        weights[i], biases[i] = fused.weights, fused.bias
+
+        out_of_bag = np.ones(n, dtype=bool)
+        out_of_bag[rows] = False
+        held_out = np.flatnonzero(out_of_bag)
+        sample = rng.choice(held_out, min(RESIDUALS_PER_REPLICA, len(held_out)), replace=False)
+        residuals.append(y[sample] - fused.predict(X[sample]))
+    return weights, biases, np.concatenate(residuals)
+
+
+def _sorted_quantile(values, q):
+    # Linear-interpolated quantile of each row of an already sorted matrix, matching np.quantile
+    position = q * (values.shape[1] - 1)
+    below = int(np.floor(position))
+    above = min(below + 1, values.shape[1] - 1)
+    fraction = position - below
+    return values[:, below] * (1 - fraction) + values[:, above] * fraction
+
+
+def train_bootstrap(params=None, n_replicas=DEFAULT_REPLICAS, max_workers=None, seed=0):
+    # Fit n_replicas bootstrap copies of the scaler + model, spread over a process pool
+    # in one batch of seeds per worker. max_workers=1 fits them in this process.
+    params = dict(DEFAULT_DATA_PARAMS, **(params or {}))
+    if params['chunk_size']:
+        raise ValueError("Bootstrap intervals need the training data in memory; unset chunk_size")
+    if n_replicas < 2:
+        raise ValueError("Need at least two bootstrap replicas")
+    X_train, y_train = training_sample(params, MAX_BOOTSTRAP_ROWS, seed)
+    seeds = np.random.RandomState(seed).randint(0, 2 ** 31 - 1, n_replicas)
+
+    workers = min(max_workers or os.cpu_count() or 1, n_replicas)
+    if workers == 1:
+        parts = [_fit_replicas(X_train, y_train, seeds, params['model'])]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(
+                _fit_replicas, repeat(X_train), repeat(y_train),
+                np.array_split(seeds, workers), repeat(params['model'])
+            ))
+
+    return BootstrapEnsemble(
+        np.vstack([part[0] for part in parts]),
+        np.concatenate([part[1] for part in parts]),
+        np.concatenate([part[2] for part in parts])
+    )
+
+
+class BootstrapEnsemble:
+    # Every replica's fused weights stacked into one (replicas, features) matrix, so
+    # pricing all replicas for any number of rows is a single matrix multiply.
+
+    def __init__(self, weights, biases, residuals=()):
+        self.weights = np.ascontiguousarray(weights, dtype=np.float64)
+        self.biases = np.ascontiguousarray(biases, dtype=np.float64)
+        self.residuals = np.sort(np.asarray(residuals, dtype=np.float64))
+        self.n_replicas, self.n_features = self.weights.shape
+
+    def predict_all(self, X):
+        # (rows, replicas) matrix of every replica's prediction
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected an (n, {self.n_features}) array, got shape {X.shape}")
+        return X @ self.weights.T + self.biases
+
+    def interval(self, X, level=DEFAULT_LEVEL, include_noise=True):
+        # Returns (low, high) arrays. Without noise this is the percentile interval of
+        # the replicas, i.e. the uncertainty in the fitted model. With noise, each side
+        # is widened by the matching out-of-bag residual quantile, added in quadrature,
+        # so the range covers where an individual sale price is likely to land.
+        if not 0 < level < 1:
+            raise ValueError("level must be between 0 and 1")
+        X = np.asarray(X, dtype=np.float64)
+        tail = (1 - level) / 2
+        low = np.empty(len(X))
+        high = np.empty(len(X))
+        center = np.empty(len(X))
+        block = max(1, _BLOCK_VALUES // self.n_replicas)
+        for start in range(0, len(X), block):
+            replicas = self.predict_all(X[start:start + block])
+            center[start:start + block] = replicas.mean(axis=1)
+            # An in-place sort of the fresh block is far cheaper than np.quantile's copies
+            replicas.sort(axis=1)
+            low[start:start + block] = _sorted_quantile(replicas, tail)
+            high[start:start + block] = _sorted_quantile(replicas, 1 - tail)
+
+        if include_noise and self.residuals.size:
+            noise_low, noise_high = np.quantile(self.residuals, [tail, 1 - tail])
+            low = center - np.hypot(center - low, noise_low)
+            high = center + np.hypot(high - center, noise_high)
+        return low, high
+
+    def interval_row(self, row, level=DEFAULT_LEVEL, include_noise=True):
+        low, high = self.interval(np.asarray(row, dtype=np.float64).reshape(1, -1), level, include_noise)
+        return float(low[0]), float(high[0])
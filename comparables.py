@@ -0,0 +1,97 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from sklearn.neighbors import KDTree, NearestNeighbors
+from sklearn.preprocessing import StandardScaler
+
+from house_model import DEFAULT_DATA_PARAMS, FEATURES, training_sample
+from valuation_defaults import DEFAULT_NEIGHBOURS
+
+# Rows per KD-tree leaf; sklearn's default, which suits 8 standardised features
+LEAF_SIZE = 40
+
+# A large dataset is indexed through a sample of this many of its training rows, read
+# from the memory map rather than loading every row
+MAX_INDEX_ROWS = 1000000
+
+# Up to this many indexed rows, bulk queries are faster as one blocked distance matrix
+# than as a tree walk per row (measured crossover at 8 features: ~10k rows)
+BRUTE_FORCE_ROWS = 10000
+
+# Bulk tree queries run in blocks of this many rows, one block per thread at a time;
+# the tree walk releases the GIL
+_QUERY_BLOCK_ROWS = 10000
+
+
+def build_comparables(params=None, leaf_size=LEAF_SIZE):
+    # Index the training rows train_model fits on
+    params = dict(DEFAULT_DATA_PARAMS, **(params or {}))
+    if params['chunk_size']:
+        raise ValueError("Comparables need the training data in memory; unset chunk_size")
+    X_train, y_train = training_sample(params, MAX_INDEX_ROWS)
+    return ComparablesIndex.build(X_train, y_train, leaf_size)
+
+
+class ComparablesIndex:
+    # KD-tree over the standardised training matrix, so one standard deviation of
+    # square footage counts as much as one of location rating. The raw rows and
+    # their prices are kept alongside to show what each neighbour was.
+
+    def __init__(self, rows, prices, mean, scale, tree):
+        self.rows = rows
+        self.prices = prices
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.tree = tree
+        self.n_rows = len(prices)
+        self._brute = None
+
+    @classmethod
+    def build(cls, X, y, leaf_size=LEAF_SIZE):
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        scaler = StandardScaler().fit(X)
+        tree = KDTree(scaler.transform(X), leaf_size=leaf_size)
+        return cls(X, np.asarray(y, dtype=np.float64), scaler.mean_, scaler.scale_, tree)
+
+    def query(self, X, k=DEFAULT_NEIGHBOURS, max_workers=None):
+        # (distances, indices), each (rows, k) and nearest first; distances are in
+        # standardised units
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != len(self.mean):
+            raise ValueError(f"Expected an (n, {len(self.mean)}) array, got shape {X.shape}")
+        k = min(k, self.n_rows)
+        scaled = (X - self.mean) / self.scale
+        if len(X) == 1:
+            return self.tree.query(scaled, k=k)
+        if self.n_rows <= BRUTE_FORCE_ROWS:
+            return self._brute_force().kneighbors(scaled, k)
+
+        blocks = [scaled[start:start + _QUERY_BLOCK_ROWS] for start in range(0, len(X), _QUERY_BLOCK_ROWS)]
+        workers = min(max_workers or os.cpu_count() or 1, len(blocks))
+        if workers == 1:
+            parts = [self.tree.query(block, k=k) for block in blocks]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                parts = list(pool.map(lambda block: self.tree.query(block, k=k), blocks))
+        return np.vstack([part[0] for part in parts]), np.vstack([part[1] for part in parts])
+
+    def _brute_force(self):
+        # Built on first bulk query from the tree's own copy of the scaled rows
+        if self._brute is None:
+            data = np.asarray(self.tree.get_arrays()[0])
+            self._brute = NearestNeighbors(algorithm='brute').fit(data)
+        return self._brute
+
+    def neighbour_prices(self, X, k=DEFAULT_NEIGHBOURS, max_workers=None):
+        # (distances, prices) of the k nearest training rows to every row of X
+        distances, indices = self.query(X, k, max_workers)
+        return distances, self.prices[indices]
+
+    def nearest(self, row, k=DEFAULT_NEIGHBOURS):
+        # [(distance, {feature: value}, price)] for one property, nearest first
+        distances, indices = self.query(np.asarray(row, dtype=np.float64).reshape(1, -1), k)
+        return [
+            (float(distance), dict(zip(FEATURES, self.rows[index].tolist())), float(self.prices[index]))
+            for distance, index in zip(distances[0], indices[0])
+        ]
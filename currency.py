@@ -0,0 +1,108 @@
+import numpy as np
+
+# Largest magnitude the vectorized path handles in int64; anything bigger is formatted
+# one value at a time with Python's arbitrary-precision ints
+_INT64_LIMIT = 2 ** 63 - 1
+_POWERS_OF_TEN = 10 ** np.arange(1, 19, dtype=np.int64)
+_strings = getattr(np, 'strings', np.char)
+
+
+def format_indian_currency(amount, paise=False):
+    # Lakh/crore grouping (12,34,56,789) for any magnitude, with a leading '-' for
+    # negative amounts. HousePricePredictionApp.format_indian_currency delegates here.
+    if paise:
+        rupees, fraction = divmod(int(round(abs(amount) * 100)), 100)
+    else:
+        rupees, fraction = abs(int(amount)), 0
+
+    digits = str(rupees)
+    head, tail = digits[:-3], digits[-3:]
+    groups = [head[max(i - 2, 0):i] for i in range(len(head), 0, -2)][::-1]
+    formatted = ','.join(groups + [tail])
+    if paise:
+        formatted += f'.{fraction:02d}'
+    if amount < 0 and (rupees or fraction):
+        formatted = '-' + formatted
+    return formatted
+
+
+def _comma_count(n_digits):
+    # Commas inside the lowest n_digits digits: one after the thousands, then every two
+    return np.where(n_digits > 3, (n_digits - 2) // 2, 0)
+
+
+def format_indian_currency_array(amounts, paise=False):
+    # Same output as format_indian_currency for every element, but built for the whole
+    # array at once: digits and commas are written into a fixed-width byte matrix
+    # column by column, so the cost is a few NumPy passes rather than a Python loop.
+    amounts = np.asarray(amounts)
+    shape = amounts.shape
+    amounts = amounts.ravel()
+    if amounts.dtype.kind == 'f' and not np.all(np.isfinite(amounts)):
+        raise ValueError("Cannot format NaN or infinite amounts")
+    if amounts.size == 0:
+        return np.empty(shape, dtype=str)
+
+    integers = amounts.dtype.kind in 'iu'
+    if integers:
+        # Only these have no int64 absolute value: the int64 minimum and uint64 past it
+        if amounts.dtype == np.uint64:
+            huge = amounts > _INT64_LIMIT
+        elif amounts.dtype == np.int64:
+            huge = amounts == np.iinfo(np.int64).min
+        else:
+            huge = np.zeros(amounts.shape, dtype=bool)
+    else:
+        limit = _INT64_LIMIT / 100 if paise else _INT64_LIMIT
+        huge = np.abs(amounts.astype(np.float64)) >= limit
+    safe = np.where(huge, 0, amounts)
+
+    if integers:
+        # Whole rupees straight from the integers, with or without paise: going through
+        # float64 would round away digits above 2**53 and invent paise
+        rupees = np.abs(safe.astype(np.int64))
+        fraction = np.zeros_like(rupees)
+    elif paise:
+        units = np.rint(np.abs(safe.astype(np.float64)) * 100).astype(np.int64)
+        rupees, fraction = np.divmod(units, 100)
+    else:
+        rupees = np.trunc(np.abs(safe)).astype(np.int64)
+        fraction = np.zeros_like(rupees)
+    negative = (safe < 0) & ((rupees != 0) | (fraction != 0))
+
+    n_digits = 1 + np.searchsorted(_POWERS_OF_TEN, rupees, side='right')
+    max_digits = int(n_digits.max())
+    suffix = 3 if paise else 0
+    width = 1 + max_digits + int(_comma_count(max_digits)) + suffix
+
+    # UCS-4 code points, so the matrix can be viewed as a str array without a copy
+    buffer = np.full((amounts.size, width), ord(' '), dtype=np.uint32)
+    remaining = rupees.copy()
+    for k in range(max_digits):
+        remaining, digit = np.divmod(remaining, 10)
+        column = width - 1 - suffix - k - int(_comma_count(k + 1))
+        present = n_digits > k
+        buffer[:, column] = np.where(present, ord('0') + digit, ord(' '))
+        if k >= 3 and (k - 3) % 2 == 0:
+            # Digit k is the lowest of a new group, so a comma sits to its right
+            buffer[:, column + 1] = np.where(present, ord(','), ord(' '))
+
+    if paise:
+        buffer[:, -3] = ord('.')
+        buffer[:, -2] = ord('0') + fraction // 10
+        buffer[:, -1] = ord('0') + fraction % 10
+
+    # The sign goes immediately left of each row's leading digit
+    rows = np.flatnonzero(negative)
+    if rows.size:
+        leading = n_digits[rows]
+        sign_column = width - 1 - suffix - (leading - 1) - _comma_count(leading) - 1
+        buffer[rows, sign_column] = ord('-')
+
+    formatted = _strings.lstrip(buffer.view(np.dtype(('U', width))).ravel(), ' ')
+    if huge.any():
+        formatted = formatted.astype(object)
+        for i in np.flatnonzero(huge):
+            formatted[i] = format_indian_currency(amounts[i].item(), paise)
+        formatted = formatted.astype(str)
+    return formatted.reshape(shape)
@@ -0,0 +1,193 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from feature_schema import FEATURE_SCHEMA, default_validator
+from house_model import FEATURES
+from instrumentation import instrumentation
+
+DEFAULT_DATASET_DIR = os.environ.get(
+    'HOUSE_PRICE_DATASET_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'model_cache', 'datasets')
+)
+
+TARGET_COLUMN = 'Price'
+# Bump whenever the cache layout changes so old caches are rebuilt
+DATASET_VERSION = 1
+PARSE_CHUNK_ROWS = 500000
+
+_INT_TYPES = (np.int8, np.int16, np.int32, np.int64)
+
+
+def storage_dtype(spec):
+    # Narrowest dtype that holds every value the schema allows: whole-number features
+    # get the smallest integer type covering their range, measurements float32
+    if spec.dtype is int:
+        low = spec.minimum if spec.allowed is None else min(spec.allowed)
+        high = spec.maximum if spec.allowed is None else max(spec.allowed)
+        if low is not None and high is not None:
+            for dtype in _INT_TYPES:
+                info = np.iinfo(dtype)
+                if info.min <= low and high <= info.max:
+                    return np.dtype(dtype)
+        return np.dtype(np.int64)
+    return np.dtype(np.float32)
+
+
+FEATURE_DTYPES = {spec.name: storage_dtype(spec) for spec in FEATURE_SCHEMA}
+# Prices stay float64: whole rupees above 2**24 (about 1.7 crore) are not exact in float32
+TARGET_DTYPE = np.dtype(np.float64)
+
+
+def source_fingerprint(csv_path):
+    # Identifies one version of the source file without reading it
+    stat = os.stat(csv_path)
+    return {'path': os.path.abspath(csv_path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def cache_dir_for(csv_path, dataset_dir=DEFAULT_DATASET_DIR, target=TARGET_COLUMN):
+    key = json.dumps({'path': os.path.abspath(csv_path), 'target': target}, sort_keys=True)
+    return os.path.join(dataset_dir, hashlib.sha256(key.encode('utf-8')).hexdigest()[:24])
+
+
+def build_cache(csv_path, cache_dir, target=TARGET_COLUMN, chunk_rows=PARSE_CHUNK_ROWS):
+    # Parse the CSV once, in chunks, appending each column in its storage dtype to its own
+    # raw binary file. Rows that break the feature schema or lack a price are dropped.
+    import pandas as pd
+
+    fingerprint = source_fingerprint(csv_path)
+    columns = FEATURES + [target]
+    dtypes = dict(FEATURE_DTYPES, **{target: TARGET_DTYPE})
+    parent = os.path.dirname(cache_dir) or '.'
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix='.tmp-', dir=parent)
+    rows = skipped = 0
+    start = time.perf_counter()
+    try:
+        files = {name: open(os.path.join(tmp_dir, f'{name}.bin'), 'wb') for name in columns}
+        try:
+            reader = pd.read_csv(csv_path, usecols=columns, chunksize=chunk_rows,
+                                 dtype={name: np.float64 for name in columns})
+            for chunk in reader:
+                X = chunk[FEATURES].to_numpy(dtype=np.float64)
+                y = chunk[target].to_numpy(dtype=np.float64)
+                valid = ~default_validator.validate(X).mask.any(axis=1) & np.isfinite(y)
+                skipped += int(len(y) - valid.sum())
+                for i, name in enumerate(FEATURES):
+                    files[name].write(X[valid, i].astype(dtypes[name]).tobytes())
+                files[target].write(y[valid].tobytes())
+                rows += int(valid.sum())
+        finally:
+            for f in files.values():
+                f.close()
+
+        meta = {
+            'version': DATASET_VERSION,
+            'source': fingerprint,
+            'target': target,
+            'rows': rows,
+            'skipped_rows': skipped,
+            'columns': {name: dtypes[name].str for name in columns},
+            'parse_seconds': time.perf_counter() - start
+        }
+        with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+            json.dump(meta, f, indent=2, sort_keys=True)
+        if os.path.isdir(cache_dir):
+            shutil.rmtree(cache_dir)
+        os.replace(tmp_dir, cache_dir)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return cache_dir
+
+
+class ColumnarDataset:
+    # A built cache opened zero-copy: every column is a read-only np.memmap, so opening
+    # costs a few page-table entries and rows are only read when they are touched
+
+    def __init__(self, cache_dir):
+        with open(os.path.join(cache_dir, 'meta.json')) as f:
+            self.meta = json.load(f)
+        self.cache_dir = cache_dir
+        self.target = self.meta['target']
+        self.n_rows = self.meta['rows']
+        self.columns = {
+            name: (np.memmap(os.path.join(cache_dir, f'{name}.bin'), dtype=np.dtype(dtype), mode='r',
+                             shape=(self.n_rows,))
+                   if self.n_rows else np.empty(0, dtype=np.dtype(dtype)))
+            for name, dtype in self.meta['columns'].items()
+        }
+
+    def __len__(self):
+        return self.n_rows
+
+    def block(self, start=0, stop=None):
+        # (X, y) as float64 for rows [start, stop); only that slice of each column is read
+        stop = self.n_rows if stop is None else min(stop, self.n_rows)
+        X = np.empty((max(stop - start, 0), len(FEATURES)))
+        for i, name in enumerate(FEATURES):
+            X[:, i] = self.columns[name][start:stop]
+        return X, np.asarray(self.columns[self.target][start:stop], dtype=np.float64)
+
+    def arrays(self):
+        return self.block()
+
+    def take(self, indices):
+        # (X, y) as float64 for the given rows; sorted indices read only the pages they touch
+        indices = np.asarray(indices, dtype=np.intp)
+        X = np.empty((len(indices), len(FEATURES)))
+        for i, name in enumerate(FEATURES):
+            X[:, i] = self.columns[name][indices]
+        return X, np.asarray(self.columns[self.target][indices], dtype=np.float64)
+
+    def iter_chunks(self, chunk_size=PARSE_CHUNK_ROWS):
+        for start in range(0, self.n_rows, chunk_size):
+            yield self.block(start, start + chunk_size)
+
+    def nbytes(self):
+        return sum(column.nbytes for column in self.columns.values())
+
+
+def open_dataset(csv_path, dataset_dir=DEFAULT_DATASET_DIR, target=TARGET_COLUMN, rebuild=False):
+    # The cached columns for csv_path, parsing the CSV only when there is no cache yet
+    # or the file has changed since it was built
+    cache_dir = cache_dir_for(csv_path, dataset_dir, target)
+    if not rebuild:
+        try:
+            with open(os.path.join(cache_dir, 'meta.json')) as f:
+                meta = json.load(f)
+            if meta.get('version') == DATASET_VERSION and meta.get('source') == source_fingerprint(csv_path):
+                with instrumentation.timer('dataset.open'):
+                    return ColumnarDataset(cache_dir)
+        except (OSError, ValueError):
+            pass
+    with instrumentation.timer('dataset.parse'):
+        build_cache(csv_path, cache_dir, target)
+    return ColumnarDataset(cache_dir)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parse a listings CSV into the columnar training cache.")
+    parser.add_argument('csv', help="CSV with the eight feature columns and a price column")
+    parser.add_argument('--target', default=TARGET_COLUMN, help="price column (default: Price)")
+    parser.add_argument('--dataset-dir', default=DEFAULT_DATASET_DIR)
+    parser.add_argument('--rebuild', action='store_true', help="parse again even if the cache is current")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    data = open_dataset(args.csv, args.dataset_dir, args.target, args.rebuild)
+    print(f"{len(data):,} rows ({data.meta['skipped_rows']:,} invalid rows dropped), "
+          f"{data.nbytes() / 1e6:,.1f} MB in {data.cache_dir} ({time.perf_counter() - start:.2f}s)",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+
+from feature_schema import FEATURES
+
+DEFAULT_HISTORY_PATH = os.environ.get(
+    'HOUSE_PRICE_HISTORY_DB',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'estimates.sqlite3')
+)
+
+FEATURE_COLUMNS = [feature.lower() for feature in FEATURES]
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS estimates (
+    id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL,
+    {', '.join(f'{column} REAL NOT NULL' for column in FEATURE_COLUMNS)},
+    prediction REAL NOT NULL,
+    model_version TEXT NOT NULL
+);
+-- Time-window scans, and rating-first lookups such as "rating >= 8 in the last 30 days"
+CREATE INDEX IF NOT EXISTS idx_estimates_created_rating ON estimates (created_at, location_rating);
+CREATE INDEX IF NOT EXISTS idx_estimates_rating_created ON estimates (location_rating, created_at);
+"""
+
+INSERT = (
+    f"INSERT INTO estimates (created_at, {', '.join(FEATURE_COLUMNS)}, prediction, model_version) "
+    f"VALUES ({', '.join('?' * (len(FEATURE_COLUMNS) + 3))})"
+)
+
+
+def _connect(path):
+    connection = sqlite3.connect(path, timeout=30)
+    connection.execute('PRAGMA journal_mode=WAL')
+    # WAL + NORMAL only risks the last transactions on power loss, never corruption
+    connection.execute('PRAGMA synchronous=NORMAL')
+    return connection
+
+
+class EstimateHistory:
+    # Append-only store of every valuation. record() only enqueues; a writer thread
+    # commits the queue in batched transactions so the Tk loop never waits on disk.
+
+    def __init__(self, path=DEFAULT_HISTORY_PATH, batch_size=500, flush_interval=0.5):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._closed = threading.Event()
+        # Set once the writer thread has created the schema; opening the database and
+        # running the schema script can block on disk, so it stays off the caller's thread
+        self._ready = threading.Event()
+
+        self._writer = threading.Thread(target=self._run, name='estimate-writer', daemon=True)
+        self._writer.start()
+
+    def record(self, features, prediction, model_version, created_at=None):
+        if self._closed.is_set():
+            raise RuntimeError("Estimate history is closed")
+        if len(features) != len(FEATURE_COLUMNS):
+            raise ValueError(f"Expected {len(FEATURE_COLUMNS)} feature values, got {len(features)}")
+        row = (created_at if created_at is not None else time.time(),
+               *(float(value) for value in features), float(prediction), str(model_version))
+        self._queue.put(row)
+
+    def flush(self):
+        # Block until everything recorded so far is committed
+        self._queue.join()
+
+    def close(self):
+        if self._closed.is_set():
+            return
+        self.flush()
+        self._closed.set()
+        self._writer.join()
+
+    def _run(self):
+        try:
+            connection = _connect(self.path)
+            connection.executescript(SCHEMA)
+        except sqlite3.Error as e:
+            print(f"Could not open the estimate history {self.path}: {e}", file=sys.stderr)
+            connection = None
+        finally:
+            self._ready.set()
+        if connection is None:
+            self._discard()
+            return
+        try:
+            while not self._closed.is_set():
+                try:
+                    batch = [self._queue.get(timeout=self.flush_interval)]
+                except queue.Empty:
+                    continue
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                try:
+                    with connection:
+                        connection.executemany(INSERT, batch)
+                except sqlite3.Error as e:
+                    # Keep the writer alive; one bad batch must not stop later saves
+                    print(f"Could not save {len(batch)} estimates: {e}", file=sys.stderr)
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+            connection.execute('PRAGMA optimize')
+        finally:
+            connection.close()
+
+    def _discard(self):
+        # Without a database, drain the queue so flush() and close() still return
+        while not self._closed.is_set():
+            try:
+                self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            self._queue.task_done()
+
+    def query(self, min_location_rating=None, since=None, until=None, limit=None):
+        # Newest first; uses a short-lived reader connection, which WAL lets run
+        # alongside the writer
+        clauses, params = [], []
+        if min_location_rating is not None:
+            clauses.append('location_rating >= ?')
+            params.append(min_location_rating)
+        if since is not None:
+            clauses.append('created_at >= ?')
+            params.append(since)
+        if until is not None:
+            clauses.append('created_at < ?')
+            params.append(until)
+        sql = 'SELECT * FROM estimates'
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        sql += ' ORDER BY created_at DESC'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(int(limit))
+
+        self._ready.wait()
+        connection = _connect(self.path)
+        connection.row_factory = sqlite3.Row
+        try:
+            return connection.execute(sql, params).fetchall()
+        finally:
+            connection.close()
+
+    def recent(self, days=30, min_location_rating=None, limit=None):
+        return self.query(min_location_rating, since=time.time() - days * 86400, limit=limit)
@@ -0,0 +1,187 @@
+import numpy as np
+
+
+class FeatureSpec:
+    # One model input: its column name, how it is shown, and which values are valid.
+    # `typical` is the range the training data covers, used for defaults and sweeps.
+
+    def __init__(self, name, label, dtype=float, minimum=None, maximum=None, allowed=None,
+                 unit=None, default=None, typical=None):
+        self.name = name
+        self.label = label
+        self.dtype = dtype
+        self.minimum = minimum
+        self.maximum = maximum
+        self.allowed = None if allowed is None else tuple(allowed)
+        self.unit = unit
+        self.default = default
+        self.typical = typical or (minimum, maximum)
+
+    def display_label(self):
+        # e.g. "Bedrooms (1-5)", "Swimming Pool (0/1)", "Square Footage (sq ft)"
+        if self.allowed is not None:
+            return f"{self.label} ({'/'.join(_number(value) for value in self.allowed)})"
+        if self.minimum is not None and self.maximum is not None:
+            return f"{self.label} ({_number(self.minimum)}-{_number(self.maximum)})"
+        if self.unit:
+            return f"{self.label} ({self.unit})"
+        return self.label
+
+    def check(self, value):
+        # Reason the value is invalid, or None
+        if not np.isfinite(value):
+            return "must be a finite number"
+        if self.dtype is int and value != int(value):
+            return "must be a whole number"
+        if self.allowed is not None and value not in self.allowed:
+            return f"must be {' or '.join(_number(v) for v in self.allowed)}"
+        if self.minimum is not None and value < self.minimum:
+            return _range_reason(self)
+        if self.maximum is not None and value > self.maximum:
+            return _range_reason(self)
+        return None
+
+
+def _number(value):
+    return f"{value:g}"
+
+
+def _range_reason(spec):
+    if spec.maximum is None:
+        return f"must be at least {_number(spec.minimum)}"
+    if spec.minimum is None:
+        return f"must be at most {_number(spec.maximum)}"
+    return f"must be between {_number(spec.minimum)} and {_number(spec.maximum)}"
+
+
+# The model inputs in column order: GUI fields, CSV files and model inputs all follow it
+FEATURE_SCHEMA = [
+    FeatureSpec('Square_Footage', 'Square Footage', float, minimum=1, unit='sq ft', default=2000,
+                typical=(500, 4000)),
+    FeatureSpec('Bedrooms', 'Bedrooms', int, minimum=1, maximum=5, default=3),
+    FeatureSpec('Bathrooms', 'No. of Bathrooms', int, minimum=1, maximum=4, default=2),
+    FeatureSpec('Location_Rating', 'Location Rating', float, minimum=1, maximum=10, default=5),
+    FeatureSpec('Floor_Number', 'Floor Number', int, minimum=1, maximum=20, default=5),
+    FeatureSpec('Parking_Spots', 'No. of Parking Spots', int, minimum=0, maximum=2, default=1),
+    FeatureSpec('Swimming_Pool', 'Swimming Pool', int, allowed=(0, 1), default=0, typical=(0, 1)),
+    FeatureSpec('Security_Rating', 'Security Rating', float, minimum=1, maximum=10, default=5)
+]
+
+FEATURE_SPECS = {spec.name: spec for spec in FEATURE_SCHEMA}
+
+# Column order used everywhere: GUI fields, CSV files and the model inputs
+FEATURES = [spec.name for spec in FEATURE_SCHEMA]
+
+
+def parse_inputs(texts, schema=FEATURE_SCHEMA):
+    # Parse one property's text inputs (as typed into the GUI) in schema order.
+    # Returns (values, errors) with every problem found, not just the first.
+    values, errors = [], []
+    for spec, text in zip(schema, texts):
+        text = text.strip()
+        if not text:
+            errors.append((spec.name, f"Please enter a value for {spec.label}"))
+            continue
+        try:
+            value = float(text)
+        except ValueError:
+            errors.append((spec.name, f"Please enter a valid number for {spec.label}"))
+            continue
+        reason = spec.check(value)
+        if reason is not None:
+            errors.append((spec.name, f"{spec.label} {reason}"))
+        values.append(value)
+    return values, errors
+
+
+class ValidationError(ValueError):
+    def __init__(self, report, message=None):
+        super().__init__(message or report.summary())
+        self.report = report
+
+
+class ValidationReport:
+    # Result of validating a whole matrix: `mask` has one flag per (row, column) that
+    # breaks the schema, and `reasons` the matching per-check masks
+
+    def __init__(self, schema, X, reasons, row_offset=0):
+        self.schema = schema
+        self.X = X
+        self.reasons = reasons
+        self.row_offset = row_offset
+        self.mask = np.zeros(X.shape, dtype=bool)
+        for mask in reasons.values():
+            self.mask |= mask
+        self.invalid_rows = np.flatnonzero(self.mask.any(axis=1))
+
+    @property
+    def ok(self):
+        return self.invalid_rows.size == 0
+
+    def column_counts(self):
+        # Number of violating rows per column
+        counts = self.mask.sum(axis=0)
+        return {spec.name: int(count) for spec, count in zip(self.schema, counts) if count}
+
+    def violations(self, limit=None):
+        # (row, column, value, reason) for every violating cell, rows numbered from row_offset
+        cells = np.argwhere(self.mask)
+        if limit is not None:
+            cells = cells[:limit]
+        for row, column in cells:
+            spec = self.schema[column]
+            value = float(self.X[row, column])
+            yield int(row) + self.row_offset, spec.name, value, spec.check(value)
+
+    def examples(self, limit=3):
+        return '; '.join(f"row {row} {name}={value:g} {reason}"
+                         for row, name, value, reason in self.violations(limit))
+
+    def summary(self, examples=3):
+        if self.ok:
+            return "All rows are valid"
+        columns = ', '.join(f"{name} ({count})" for name, count in self.column_counts().items())
+        return f"{self.invalid_rows.size:,} invalid rows, by column: {columns}. First: {self.examples(examples)}"
+
+
+class BulkValidator:
+    # The schema compiled into per-column bound and flag arrays, so validation is a few
+    # broadcast comparisons over the whole (rows, features) matrix
+
+    def __init__(self, schema=FEATURE_SCHEMA):
+        self.schema = list(schema)
+        self.minimum = np.array([-np.inf if s.minimum is None else s.minimum for s in self.schema])
+        self.maximum = np.array([np.inf if s.maximum is None else s.maximum for s in self.schema])
+        self.integer_columns = np.array([i for i, s in enumerate(self.schema) if s.dtype is int], dtype=np.intp)
+        self.allowed = [(i, np.array(s.allowed, dtype=np.float64))
+                        for i, s in enumerate(self.schema) if s.allowed is not None]
+
+    def validate(self, X, row_offset=0):
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != len(self.schema):
+            raise ValueError(f"Expected an (n, {len(self.schema)}) array, got shape {X.shape}")
+
+        finite = np.isfinite(X)
+        reasons = {'not_finite': ~finite}
+        with np.errstate(invalid='ignore'):
+            reasons['out_of_range'] = finite & ((X < self.minimum) | (X > self.maximum))
+            not_integer = np.zeros(X.shape, dtype=bool)
+            if self.integer_columns.size:
+                block = X[:, self.integer_columns]
+                not_integer[:, self.integer_columns] = np.isfinite(block) & (block != np.floor(block))
+            reasons['not_integer'] = not_integer
+        not_allowed = np.zeros(X.shape, dtype=bool)
+        for column, allowed in self.allowed:
+            not_allowed[:, column] = finite[:, column] & ~np.isin(X[:, column], allowed)
+        reasons['not_allowed'] = not_allowed
+        return ValidationReport(self.schema, X, reasons, row_offset)
+
+    def check(self, X, row_offset=0):
+        # Raise ValidationError listing the violations, if there are any
+        report = self.validate(X, row_offset)
+        if not report.ok:
+            raise ValidationError(report)
+        return report
+
+
+default_validator = BulkValidator()
@@ -0,0 +1,117 @@
+import time
+import tkinter as tk
+
+from instrumentation import instrumentation
+
+# Animations due within this many ms of the current tick run on it rather than
+# arming another timer a few ms later
+COALESCE_MS = 8
+
+
+class FrameClock:
+    # Single root.after() chain that drives every UI animation. Each animation asks for a
+    # period; a tick runs everything that is due and re-arms one timer for the next
+    # deadline. Late ticks drop frames instead of replaying them, and nothing is
+    # scheduled at all while the window is iconified or withdrawn.
+
+    def __init__(self, root):
+        self.root = root
+        self.animations = {}
+        self.suspended = False
+        self.ticks = 0
+        self.frames = 0
+        self.dropped = 0
+        self._next_handle = 0
+        self._job = None
+        self._job_due = None
+        root.bind('<Unmap>', self._on_unmap, add='+')
+        root.bind('<Map>', self._on_map, add='+')
+
+    def add(self, callback, period_ms, delay_ms=None):
+        # callback(frames) runs once per due frame; frames > 1 means that many frames
+        # were due at once and the animation should jump ahead. Returning False (or the
+        # animation's widget being destroyed) unregisters it.
+        handle = self._next_handle
+        self._next_handle += 1
+        period = period_ms / 1000.0
+        delay = period if delay_ms is None else delay_ms / 1000.0
+        self.animations[handle] = [callback, period, time.monotonic() + delay]
+        self._reschedule()
+        return handle
+
+    def remove(self, handle):
+        self.animations.pop(handle, None)
+        if not self.animations:
+            self._cancel()
+
+    def suspend(self):
+        if not self.suspended:
+            self.suspended = True
+            self._cancel()
+
+    def resume(self):
+        if self.suspended:
+            self.suspended = False
+            # Pick up from now rather than replaying the time spent hidden
+            now = time.monotonic()
+            for animation in self.animations.values():
+                animation[2] = max(animation[2], now)
+            self._reschedule()
+
+    def stats(self):
+        return {
+            'animations': len(self.animations),
+            'suspended': self.suspended,
+            'ticks': self.ticks,
+            'frames': self.frames,
+            'dropped': self.dropped
+        }
+
+    def _on_unmap(self, event):
+        # Bindings on the root also see its children's events
+        if event.widget is self.root:
+            self.suspend()
+
+    def _on_map(self, event):
+        if event.widget is self.root:
+            self.resume()
+
+    def _cancel(self):
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = self._job_due = None
+
+    def _reschedule(self):
+        if self.suspended or not self.animations:
+            self._cancel()
+            return
+        due = min(animation[2] for animation in self.animations.values())
+        if self._job is not None and self._job_due <= due:
+            return
+        self._cancel()
+        delay_ms = max(0, int((due - time.monotonic()) * 1000))
+        self._job = self.root.after(delay_ms, self._tick)
+        self._job_due = due
+
+    def _tick(self):
+        self._job = self._job_due = None
+        with instrumentation.timer('frame_clock.tick'):
+            self.ticks += 1
+            now = time.monotonic()
+            horizon = now + COALESCE_MS / 1000.0
+            for handle, animation in list(self.animations.items()):
+                callback, period, due = animation
+                if due > horizon or handle not in self.animations:
+                    continue
+                frames = 1 + int(max(0.0, now - due) // period)
+                self.frames += 1
+                self.dropped += frames - 1
+                animation[2] = due + frames * period
+                try:
+                    keep = callback(frames)
+                except tk.TclError:
+                    # The animated widget has been destroyed
+                    keep = False
+                if keep is False:
+                    self.animations.pop(handle, None)
+        self._reschedule()
@@ -0,0 +1,436 @@
+import numpy as np
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+from sklearn.linear_model import LinearRegression, Ridge, Lasso
+
+from feature_schema import FEATURES
+from instrumentation import instrumentation
+
+# Parameters of the synthetic Delhi real estate data the model is trained on
+DEFAULT_DATA_PARAMS = {
+    'n_samples': 1000,
+    'seed': 42,
+    'base_price_per_sqft': 12000,
+    'noise_std': 5000000,
+    'test_size': 0.2,
+    'split_seed': 42,
+    # None trains in memory; a row count trains out-of-core in chunks of that size
+    'chunk_size': None,
+    # Regressor to fit, by MODEL_REGISTRY name
+    'model': 'linear',
+    # Path of a listings CSV to train on instead of the synthetic data (see dataset.py)
+    'dataset': None
+}
+
+
+
+def _hist_gradient_boosting():
+    # sklearn.ensemble is slow to import, so only pay for it when a tree model is used
+    from sklearn.ensemble import HistGradientBoostingRegressor
+    return HistGradientBoostingRegressor(random_state=42)
+
+
+def _random_forest():
+    from sklearn.ensemble import RandomForestRegressor
+    return RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=1)
+
+
+# Regressors that can be trained on the scaled features. Factories rather than
+# instances so every fit starts from a fresh estimator.
+MODEL_REGISTRY = {
+    'linear': LinearRegression,
+    'ridge': lambda: Ridge(alpha=1.0),
+    'lasso': lambda: Lasso(alpha=1.0, max_iter=10000),
+    'hist_gradient_boosting': _hist_gradient_boosting,
+    'random_forest': _random_forest
+}
+
+
+def register_model(name, factory):
+    MODEL_REGISTRY[name] = factory
+
+
+def create_model(name):
+    try:
+        factory = MODEL_REGISTRY[name]
+    except KeyError:
+        raise ValueError(f"Unknown model {name!r}; choose from {', '.join(MODEL_REGISTRY)}")
+    return factory()
+
+
+def generate_delhi_data(n_samples=1000, seed=42, base_price_per_sqft=12000, noise_std=5000000):
+    # Generate sample data based on Delhi real estate market
+    rng = np.random.RandomState(seed)
+    return _delhi_sample(rng, n_samples, base_price_per_sqft, noise_std)
+
+
+def iter_delhi_chunks(n_samples=1000, chunk_size=100000, seed=42, base_price_per_sqft=12000,
+                      noise_std=5000000):
+    # Same distribution as generate_delhi_data, produced chunk by chunk so that
+    # tens of millions of rows never have to exist in memory at once
+    rng = np.random.RandomState(seed)
+    for start in range(0, n_samples, chunk_size):
+        yield _delhi_sample(rng, min(chunk_size, n_samples - start), base_price_per_sqft, noise_std)
+
+
+def _delhi_sample(rng, n_samples, base_price_per_sqft, noise_std):
+    square_footage = rng.uniform(500, 4000, n_samples)
+    bedrooms = rng.randint(1, 6, n_samples)
+    bathrooms = rng.randint(1, 5, n_samples)
+    location_rating = rng.uniform(1, 10, n_samples)
+    floor_number = rng.randint(1, 20, n_samples)
+    parking_spots = rng.randint(0, 3, n_samples)
+    swimming_pool = rng.randint(0, 2, n_samples)
+    security_rating = rng.uniform(1, 10, n_samples)
+
+    X = np.column_stack([
+        square_footage, bedrooms, bathrooms, location_rating,
+        floor_number, parking_spots, swimming_pool, security_rating
+    ])
+
+    y = (
+        square_footage * base_price_per_sqft +
+        bedrooms * 1000000 +
+        bathrooms * 800000 +
+        location_rating * 500000 +
+        parking_spots * 300000 +
+        swimming_pool * 1000000 +
+        security_rating * 250000 +
+        floor_number * 50000 +
+        rng.normal(0, noise_std, n_samples)
+    )
+    return X, y
+
+
+def training_split(params=None):
+    # (X_train, X_test, y_train, y_test) for the in-memory data described by params
+    params = dict(DEFAULT_DATA_PARAMS, **(params or {}))
+    if params['dataset']:
+        # Imported here: dataset depends on this module for FEATURES
+        from dataset import open_dataset
+        X, y = open_dataset(params['dataset']).arrays()
+    else:
+        with instrumentation.timer('model.generate_data'):
+            X, y = generate_delhi_data(
+                params['n_samples'],
+                params['seed'],
+                params['base_price_per_sqft'],
+                params['noise_std']
+            )
+    with instrumentation.timer('model.split'):
+        return train_test_split(X, y, test_size=params['test_size'], random_state=params['split_seed'])
+
+
+def training_sample(params=None, max_rows=None, seed=0):
+    # (X_train, y_train) for tools that need the training rows in memory. A dataset
+    # with more than max_rows rows is not loaded whole: a uniform sample of the rows
+    # the streaming fit trains on is read straight from its memory-mapped columns.
+    params = dict(DEFAULT_DATA_PARAMS, **(params or {}))
+    if params['dataset'] and max_rows is not None:
+        from dataset import PARSE_CHUNK_ROWS, open_dataset
+        data = open_dataset(params['dataset'])
+        if len(data) > max_rows:
+            with instrumentation.timer('model.sample'):
+                return data.take(_sample_training_rows(len(data), max_rows, params, seed, PARSE_CHUNK_ROWS))
+    X_train, _, y_train, _ = training_split(params)
+    return X_train, y_train
+
+
+def _sample_training_rows(n_rows, max_rows, params, seed, chunk_size):
+    # Sorted row numbers, about max_rows of them, drawn evenly from each chunk after the
+    # same per-chunk hold-out as _accumulate, so held-out rows are never picked
+    split = np.random.RandomState(params['split_seed'])
+    pick = np.random.RandomState(seed)
+    parts = []
+    for start in range(0, n_rows, chunk_size):
+        size = min(chunk_size, n_rows - start)
+        rows = np.arange(start, start + size)
+        if params['test_size']:
+            rows = rows[split.random_sample(size) >= params['test_size']]
+        wanted = min(len(rows), int(round(max_rows * size / n_rows)))
+        parts.append(np.sort(pick.choice(rows, wanted, replace=False)))
+    return np.concatenate(parts)
+
+
+def train_model(params=None):
+    params = dict(DEFAULT_DATA_PARAMS, **(params or {}))
+    if params['dataset'] and params['model'] == 'linear':
+        # Streams the memory-mapped columns block by block, never the whole file
+        from dataset import PARSE_CHUNK_ROWS, open_dataset
+        chunks = open_dataset(params['dataset']).iter_chunks(params['chunk_size'] or PARSE_CHUNK_ROWS)
+        with instrumentation.timer('model.fit_streaming'):
+            return train_model_streaming(chunks, params['test_size'], params['split_seed'])
+    if params['chunk_size']:
+        if params['model'] != 'linear':
+            raise ValueError("Out-of-core training only supports the 'linear' model")
+        chunks = iter_delhi_chunks(
+            params['n_samples'],
+            params['chunk_size'],
+            params['seed'],
+            params['base_price_per_sqft'],
+            params['noise_std']
+        )
+        with instrumentation.timer('model.fit_streaming'):
+            return train_model_streaming(chunks, params['test_size'], params['split_seed'])
+
+    # Split, scale, and train
+    X_train, X_test, y_train, y_test = training_split(params)
+    with instrumentation.timer('model.scale'):
+        scaler = StandardScaler()
+        X_train_scaled = scaler.fit_transform(X_train)
+    with instrumentation.timer('model.fit'):
+        model = create_model(params['model'])
+        model.fit(X_train_scaled, y_train)
+    return scaler, model
+
+
+def train_model_streaming(chunks, test_size=0.0, split_seed=42):
+    # Out-of-core training: only the running statistics are kept, so peak memory
+    # is O(features^2) plus one chunk, however many rows stream through
+    return _accumulate(chunks, test_size, split_seed).to_estimators()
+
+
+def _accumulate(chunks, test_size=0.0, split_seed=42):
+    stats = RunningStats(len(FEATURES))
+    rng = np.random.RandomState(split_seed)
+    for X, y in chunks:
+        if test_size:
+            # Hold out roughly test_size of every chunk, mirroring train_test_split
+            keep = rng.random_sample(len(y)) >= test_size
+            X, y = X[keep], y[keep]
+        stats.update(X, y)
+    return stats
+
+
+def training_stats(params=None):
+    # RunningStats over the rows train_model fits the linear model on, as the starting
+    # point for online updates
+    params = dict(DEFAULT_DATA_PARAMS, **(params or {}))
+    if params['model'] != 'linear':
+        raise ValueError("Online updates only support the 'linear' model")
+    if params['dataset']:
+        from dataset import PARSE_CHUNK_ROWS, open_dataset
+        chunks = open_dataset(params['dataset']).iter_chunks(params['chunk_size'] or PARSE_CHUNK_ROWS)
+        return _accumulate(chunks, params['test_size'], params['split_seed'])
+    if params['chunk_size']:
+        chunks = iter_delhi_chunks(
+            params['n_samples'],
+            params['chunk_size'],
+            params['seed'],
+            params['base_price_per_sqft'],
+            params['noise_std']
+        )
+        return _accumulate(chunks, params['test_size'], params['split_seed'])
+    X_train, _, y_train, _ = training_split(params)
+    return RunningStats(len(FEATURES)).update(X_train, y_train)
+
+
+def build_estimators(mean, var, n_samples_seen, coef, intercept):
+    # Recreate fitted sklearn estimators directly from their learned attributes
+    return build_scaler(mean, var, n_samples_seen), build_linear_model(coef, intercept)
+
+
+def build_scaler(mean, var, n_samples_seen):
+    scaler = StandardScaler()
+    scaler.mean_ = mean
+    scaler.var_ = var
+    scaler.scale_ = _handle_zero_variance(np.sqrt(var))
+    scaler.n_features_in_ = len(mean)
+    scaler.n_samples_seen_ = n_samples_seen
+    return scaler
+
+
+def build_linear_model(coef, intercept):
+    # Any linear regressor (Ridge, Lasso...) predicts identically from coef_/intercept_
+    model = LinearRegression()
+    model.coef_ = coef
+    model.intercept_ = intercept
+    model.n_features_in_ = len(coef)
+    return model
+
+
+def is_linear_model(model):
+    coef = getattr(model, 'coef_', None)
+    return coef is not None and np.ndim(coef) == 1
+
+
+# Relative size below which a column's scatter left by RunningStats.remove is rounding
+# residue rather than variance
+REMOVE_TOLERANCE = 1e-9
+
+
+def _handle_zero_variance(scale):
+    # Same rule as StandardScaler: constant columns are left unscaled
+    scale = np.array(scale, dtype=np.float64)
+    scale[scale < 10 * np.finfo(np.float64).eps] = 1.0
+    return scale
+
+
+class RunningStats:
+    # Sufficient statistics for StandardScaler + LinearRegression: the mean of [X, y]
+    # and its centred scatter matrix. Chunks are merged with Chan's parallel update,
+    # which stays accurate where raw X^T X / X^T y sums would lose precision.
+
+    def __init__(self, n_features):
+        self.n_features = n_features
+        self.count = 0.0
+        self.mean = np.zeros(n_features + 1)
+        self.scatter = np.zeros((n_features + 1, n_features + 1))
+
+    def update(self, X, y):
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64).reshape(-1, 1)
+        n = X.shape[0]
+        if n == 0:
+            return self
+        Z = np.hstack([X, y])
+        chunk_mean = Z.mean(axis=0)
+        centred = Z - chunk_mean
+        self._merge(n, chunk_mean, centred.T @ centred)
+        return self
+
+    def merge(self, other):
+        if other.count:
+            self._merge(other.count, other.mean, other.scatter)
+        return self
+
+    def remove(self, other):
+        # Inverse of merge: take a previously merged batch back out, e.g. when it
+        # slides out of a window
+        total = self.count - other.count
+        if total <= 0:
+            self.count = 0.0
+            self.mean[:] = 0.0
+            self.scatter[:] = 0.0
+            return self
+        rest_mean = (self.mean * self.count - other.mean * other.count) / total
+        delta = other.mean - rest_mean
+        before = np.diag(self.scatter).copy()
+        self.scatter -= other.scatter + np.outer(delta, delta) * (total * other.count / self.count)
+        self.mean = rest_mean
+        self.count = total
+
+        # Subtraction leaves rounding residue where a column has become constant (e.g.
+        # no pools left in the window). A residue that small would pass as a real,
+        # tiny variance and blow up that column's coefficient, so anything within
+        # REMOVE_TOLERANCE of the column's scatter before removal is treated as zero.
+        constant = np.diag(self.scatter) <= REMOVE_TOLERANCE * before
+        self.scatter[constant, :] = 0.0
+        self.scatter[:, constant] = 0.0
+        return self
+
+    def decay(self, factor):
+        # Exponential forgetting: every row seen so far now weighs `factor` times as
+        # much. The mean is unchanged; the weights behind it shrink.
+        self.count *= factor
+        self.scatter *= factor
+        return self
+
+    def copy(self):
+        clone = RunningStats(self.n_features)
+        clone.count = self.count
+        clone.mean = self.mean.copy()
+        clone.scatter = self.scatter.copy()
+        return clone
+
+    def _merge(self, n, mean, scatter):
+        total = self.count + n
+        delta = mean - self.mean
+        self.scatter += scatter + np.outer(delta, delta) * (self.count * n / total)
+        self.mean += delta * (n / total)
+        self.count = total
+
+    def solve(self):
+        # Returns (mean, var, coef, intercept) as StandardScaler + LinearRegression would fit them
+        if self.count < 2:
+            raise ValueError("Need at least two rows to fit the model")
+        k = self.n_features
+        mean = self.mean[:k].copy()
+        var = np.diag(self.scatter)[:k] / self.count
+        scale = _handle_zero_variance(np.sqrt(var))
+
+        # Normal equations in the standardised space; the intercept is the mean of y there
+        xx = self.scatter[:k, :k] / np.outer(scale, scale)
+        xy = self.scatter[:k, k] / scale
+        coef = np.linalg.lstsq(xx, xy, rcond=None)[0]
+        return mean, var, coef, float(self.mean[k])
+
+    def to_estimators(self):
+        mean, var, coef, intercept = self.solve()
+        return build_estimators(mean, var, int(self.count), coef, intercept)
+
+
+class FusedPredictor:
+    # StandardScaler followed by LinearRegression is itself linear, so the scaler's
+    # mean/scale can be folded into the regression weights once:
+    #   coef . ((x - mean) / scale) + intercept  ==  (coef / scale) . x + bias
+    # This skips sklearn's per-call input validation, which dominates single-row latency.
+
+    def __init__(self, weights, bias):
+        self.weights = np.ascontiguousarray(weights, dtype=np.float64)
+        self.bias = float(bias)
+        self.n_features = self.weights.shape[0]
+        # Plain Python copy of the weights for the scalar path
+        self._weights_tuple = tuple(float(w) for w in self.weights)
+
+    @classmethod
+    def from_pipeline(cls, scaler, model):
+        scale = np.asarray(scaler.scale_, dtype=np.float64)
+        mean = np.asarray(scaler.mean_, dtype=np.float64)
+        coef = np.asarray(model.coef_, dtype=np.float64).ravel()
+        weights = coef / scale
+        bias = float(np.ravel(model.intercept_)[0]) - float(np.dot(weights, mean))
+        return cls(weights, bias)
+
+    def predict_scalar(self, values):
+        # Pure Python dot product; fastest for one row of a handful of features
+        if len(values) != self.n_features:
+            raise ValueError(f"Expected {self.n_features} values, got {len(values)}")
+        total = self.bias
+        for w, v in zip(self._weights_tuple, values):
+            total += w * v
+        return total
+
+    def predict_row(self, row):
+        row = np.asarray(row, dtype=np.float64)
+        if row.shape != (self.n_features,):
+            raise ValueError(f"Expected a row of {self.n_features} values, got shape {row.shape}")
+        return float(row @ self.weights) + self.bias
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected an (n, {self.n_features}) array, got shape {X.shape}")
+        return X @ self.weights + self.bias
+
+
+class PipelinePredictor:
+    # Same interface as FusedPredictor for regressors that cannot be folded into a
+    # weight vector (tree ensembles); every call goes through sklearn
+
+    def __init__(self, scaler, model):
+        self.scaler = scaler
+        self.model = model
+        self.n_features = scaler.n_features_in_
+
+    def predict_scalar(self, values):
+        return self.predict_row(values)
+
+    def predict_row(self, row):
+        row = np.asarray(row, dtype=np.float64)
+        if row.shape != (self.n_features,):
+            raise ValueError(f"Expected a row of {self.n_features} values, got shape {row.shape}")
+        return float(self.model.predict(self.scaler.transform(row.reshape(1, -1)))[0])
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected an (n, {self.n_features}) array, got shape {X.shape}")
+        return self.model.predict(self.scaler.transform(X))
+
+
+def make_predictor(scaler, model):
+    # Linear models get the fused fast path, anything else the sklearn pipeline
+    if is_linear_model(model):
+        return FusedPredictor.from_pipeline(scaler, model)
+    return PipelinePredictor(scaler, model)
@@ -0,0 +1,155 @@
+import bisect
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import nullcontext
+
+# Histogram bucket upper bounds in seconds: 1 us doubling up to ~16 s, then +Inf
+BUCKETS = tuple(1e-6 * 2 ** i for i in range(25))
+
+# Returned by timer() while disabled, so an instrumented block costs one attribute
+# check and an empty with-statement
+_DISABLED = nullcontext()
+
+
+class Histogram:
+    # Cumulative-bucket latency histogram in the Prometheus layout
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.last = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.last = seconds
+
+    def quantile(self, q):
+        # Estimated from the buckets, interpolating linearly inside the one that holds q
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for bound, count in zip(self.buckets, self.counts):
+            if count and seen + count >= rank:
+                return lower + (bound - lower) * (rank - seen) / count
+            seen += count
+            lower = bound
+        return self.buckets[-1]
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'last': self.last,
+            'p50': self.quantile(0.5),
+            'p99': self.quantile(0.99),
+            'buckets': {str(bound): count for bound, count in zip(self.buckets, self.counts)},
+            'overflow': self.counts[-1]
+        }
+
+
+class _Timer:
+    __slots__ = ('instrumentation', 'name', 'start')
+
+    def __init__(self, instrumentation, name):
+        self.instrumentation = instrumentation
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.instrumentation.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Instrumentation:
+    # Named timing histograms for the app's hot paths. Off unless enabled with --metrics
+    # or HOUSE_PRICE_METRICS=1, and it can be switched at runtime with enable()/disable().
+
+    def __init__(self, enabled=False, export_path=None):
+        self.enabled = enabled
+        self.export_path = export_path
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def timer(self, name):
+        if not self.enabled:
+            return _DISABLED
+        return _Timer(self, name)
+
+    def observe(self, name, seconds):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(seconds)
+
+    def snapshot(self):
+        with self._lock:
+            return {name: histogram.snapshot() for name, histogram in sorted(self.histograms.items())}
+
+    def summary_lines(self):
+        # One line per stage for the on-screen overlay
+        with self._lock:
+            items = sorted(self.histograms.items())
+            return [
+                f"{name:28s} last {h.last * 1000:8.3f}  p50 {h.quantile(0.5) * 1000:8.3f}  "
+                f"p99 {h.quantile(0.99) * 1000:8.3f} ms  n={h.count}"
+                for name, h in items
+            ]
+
+    def to_prometheus(self):
+        lines = [
+            '# HELP house_price_stage_seconds Time spent in each instrumented stage.',
+            '# TYPE house_price_stage_seconds histogram'
+        ]
+        with self._lock:
+            for name, histogram in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'house_price_stage_seconds_bucket{{stage="{name}",le="{bound:.6g}"}} {cumulative}')
+                lines.append(f'house_price_stage_seconds_bucket{{stage="{name}",le="+Inf"}} {histogram.count}')
+                lines.append(f'house_price_stage_seconds_sum{{stage="{name}"}} {histogram.sum!r}')
+                lines.append(f'house_price_stage_seconds_count{{stage="{name}"}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+    def export(self, path=None):
+        # A .json/.jsonl path gets one appended JSON line per export; anything else is
+        # rewritten atomically in the Prometheus text format (node_exporter textfile style)
+        path = path or self.export_path
+        if not path:
+            return
+        if path.endswith(('.json', '.jsonl')):
+            with open(path, 'a') as f:
+                f.write(json.dumps({'time': time.time(), 'stages': self.snapshot()}) + '\n')
+            return
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+
+instrumentation = Instrumentation(
+    enabled=os.environ.get('HOUSE_PRICE_METRICS') == '1' or '--metrics' in sys.argv,
+    export_path=os.environ.get(
+        'HOUSE_PRICE_METRICS_FILE',
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'house_price_metrics.prom')
+    )
+)
@@ -0,0 +1,109 @@
+import builtins
+import importlib
+import os
+import sys
+import threading
+import time
+import types
+from contextlib import contextmanager, nullcontext
+
+
+class StartupProfiler:
+    # Per-import and per-phase timing for app startup; a no-op unless enabled with
+    # --profile-startup or HOUSE_PRICE_PROFILE_STARTUP=1
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.imports = []
+        self.lazy_imports = []
+        self.phases = []
+        self._original_import = None
+        self._depth = threading.local()
+        self._started = time.perf_counter()
+
+    def track_imports(self):
+        # Time every top-level import statement until stop_tracking_imports()
+        if not self.enabled or self._original_import is not None:
+            return
+        original = self._original_import = builtins.__import__
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            depth = getattr(self._depth, 'value', 0)
+            if depth or name in sys.modules:
+                return original(name, globals, locals, fromlist, level)
+            self._depth.value = depth + 1
+            start = time.perf_counter()
+            try:
+                return original(name, globals, locals, fromlist, level)
+            finally:
+                self._depth.value = depth
+                self.imports.append((name, time.perf_counter() - start))
+
+        builtins.__import__ = timed_import
+
+    def stop_tracking_imports(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def phase(self, name):
+        if not self.enabled:
+            return nullcontext()
+        return self._timed_phase(name)
+
+    @contextmanager
+    def _timed_phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def record_lazy_import(self, name, seconds):
+        self.lazy_imports.append((name, seconds))
+        if self.enabled:
+            print(f"[startup] lazy import {name}: {seconds * 1000:.1f} ms", file=sys.stderr)
+
+    def report(self, file=None):
+        if not self.enabled:
+            return
+        file = file or sys.stderr
+        print("[startup] imports:", file=file)
+        for name, seconds in sorted(self.imports, key=lambda item: -item[1]):
+            print(f"[startup]   {name:40s} {seconds * 1000:9.1f} ms", file=file)
+        print("[startup] phases:", file=file)
+        for name, seconds in self.phases:
+            print(f"[startup]   {name:40s} {seconds * 1000:9.1f} ms", file=file)
+        total = time.perf_counter() - self._started
+        print(f"[startup] {'total':40s} {total * 1000:9.1f} ms", file=file)
+
+
+startup_profiler = StartupProfiler(
+    enabled=os.environ.get('HOUSE_PRICE_PROFILE_STARTUP') == '1' or '--profile-startup' in sys.argv
+)
+
+
+class LazyModule(types.ModuleType):
+    # Module placeholder that performs the real import on first attribute access
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__['_lazy_loaded'] = False
+
+    def __getattr__(self, attr):
+        if self.__dict__['_lazy_loaded']:
+            raise AttributeError(f"module {self.__name__!r} has no attribute {attr!r}")
+        start = time.perf_counter()
+        module = importlib.import_module(self.__name__)
+        startup_profiler.record_lazy_import(self.__name__, time.perf_counter() - start)
+        # Copy the real namespace in so later lookups never come back through here
+        self.__dict__.update(module.__dict__)
+        self.__dict__['_lazy_loaded'] = True
+        return getattr(module, attr)
+
+
+def lazy_import(name):
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
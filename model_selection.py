@@ -0,0 +1,142 @@
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import KFold, cross_validate
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from house_model import (
+    DEFAULT_DATA_PARAMS, MODEL_REGISTRY, create_model, make_predictor, train_model, training_split
+)
+from model_store import DEFAULT_STORE_DIR, promote_model
+
+
+# Fraction by which a less accurate candidate must beat the current choice's latency
+# to be preferred for speed
+MIN_SPEEDUP = 0.25
+
+
+def _pipeline(name):
+    return Pipeline([('scaler', StandardScaler()), ('model', create_model(name))])
+
+
+def _median_seconds(fn, number):
+    timings = []
+    for _ in range(number):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def evaluate_candidate(name, X_train, y_train, X_test, y_test, folds=5, seed=42, latency_calls=200):
+    # k-fold CV on the training split, then a full fit scored on the held-out split.
+    # Latency is measured on the predictor that would actually serve the model.
+    cv = cross_validate(
+        _pipeline(name), X_train, y_train,
+        cv=KFold(folds, shuffle=True, random_state=seed),
+        scoring='neg_root_mean_squared_error'
+    )
+    cv_rmse = -cv['test_score']
+
+    pipeline = _pipeline(name)
+    start = time.perf_counter()
+    pipeline.fit(X_train, y_train)
+    fit_time = time.perf_counter() - start
+
+    scaler, model = pipeline.named_steps['scaler'], pipeline.named_steps['model']
+    predictor = make_predictor(scaler, model)
+    predictions = predictor.predict(X_test)
+    row = [float(value) for value in X_test[0]]
+
+    return {
+        'name': name,
+        'cv_rmse': float(cv_rmse.mean()),
+        'cv_rmse_std': float(cv_rmse.std()),
+        'test_rmse': float(np.sqrt(mean_squared_error(y_test, predictions))),
+        'test_mae': float(mean_absolute_error(y_test, predictions)),
+        'test_r2': float(r2_score(y_test, predictions)),
+        'fit_time_s': fit_time,
+        'predict_latency_ms': _median_seconds(lambda: predictor.predict_scalar(row), latency_calls) * 1000.0,
+        'batch_rows_per_second': len(X_test) / max(_median_seconds(lambda: predictor.predict(X_test), 5), 1e-9)
+    }
+
+
+def choose_best(results, max_latency_ms=None, accuracy_tolerance=0.0, min_speedup=MIN_SPEEDUP):
+    # Among candidates within the latency budget, start from the most accurate and give
+    # up accuracy, within `accuracy_tolerance` (a fraction, 0.02 = 2%) of it, only for a
+    # model at least `min_speedup` faster than the current choice. Microsecond gaps
+    # between similar models are timer noise and must not decide the winner.
+    eligible = [r for r in results if max_latency_ms is None or r['predict_latency_ms'] <= max_latency_ms]
+    if not eligible:
+        raise ValueError(f"No candidate predicts within {max_latency_ms} ms")
+    by_error = sorted(eligible, key=lambda r: r['cv_rmse'])
+    limit = by_error[0]['cv_rmse'] * (1 + accuracy_tolerance)
+    choice = by_error[0]
+    for r in by_error[1:]:
+        if r['cv_rmse'] <= limit and r['predict_latency_ms'] <= choice['predict_latency_ms'] * (1 - min_speedup):
+            choice = r
+    return choice
+
+
+def select_model(candidates=None, params=None, folds=5, max_workers=None, max_latency_ms=None,
+                 accuracy_tolerance=0.0):
+    # Train every candidate in parallel on a process pool and pick one; returns
+    # (winner, results) with results sorted by CV error
+    params = dict(DEFAULT_DATA_PARAMS, **(params or {}))
+    candidates = list(candidates or MODEL_REGISTRY)
+    X_train, X_test, y_train, y_test = training_split(params)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            pool.submit(evaluate_candidate, name, X_train, y_train, X_test, y_test, folds, params['split_seed'])
+            for name in candidates
+        ]
+        results = [future.result() for future in futures]
+
+    results.sort(key=lambda r: r['cv_rmse'])
+    return choose_best(results, max_latency_ms, accuracy_tolerance), results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cross-validate candidate regressors and promote the best.")
+    parser.add_argument('--models', nargs='+', choices=sorted(MODEL_REGISTRY), help="candidates (default: all)")
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=None, help="process pool size (default: CPU count)")
+    parser.add_argument('--n-samples', type=int, default=DEFAULT_DATA_PARAMS['n_samples'])
+    parser.add_argument('--dataset', help="listings CSV to train on instead of synthetic data")
+    parser.add_argument('--max-latency-ms', type=float, help="single-row prediction budget")
+    parser.add_argument('--accuracy-tolerance', type=float, default=0.0,
+                        help="accept a faster model whose CV RMSE is within this fraction of the best")
+    parser.add_argument('--promote', action='store_true', help="make the winner the app's model")
+    parser.add_argument('--store-dir', default=DEFAULT_STORE_DIR)
+    args = parser.parse_args(argv)
+
+    # Absolute, so the promoted model loads whatever directory the app starts from
+    params = {'n_samples': args.n_samples, 'dataset': args.dataset and os.path.abspath(args.dataset)}
+    winner, results = select_model(
+        args.models, params, args.folds, args.workers, args.max_latency_ms, args.accuracy_tolerance
+    )
+
+    print(f"{'model':24s} {'cv rmse':>14s} {'test rmse':>14s} {'r2':>7s} {'fit s':>8s} {'row ms':>8s} {'rows/s':>12s}")
+    for r in results:
+        marker = '*' if r is winner else ' '
+        print(f"{marker}{r['name']:23s} {r['cv_rmse']:14,.0f} {r['test_rmse']:14,.0f} {r['test_r2']:7.3f} "
+              f"{r['fit_time_s']:8.3f} {r['predict_latency_ms']:8.4f} {r['batch_rows_per_second']:12,.0f}")
+
+    if args.promote:
+        params['model'] = winner['name']
+        scaler, model = train_model(params)
+        promote_model(params, scaler, model, store_dir=args.store_dir, report=results)
+        print(f"Promoted {winner['name']}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
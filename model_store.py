@@ -0,0 +1,329 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+
+import numpy as np
+
+from bootstrap import DEFAULT_REPLICAS, BootstrapEnsemble, train_bootstrap
+from comparables import ComparablesIndex, build_comparables
+from dataset import source_fingerprint
+from house_model import (
+    FEATURES, DEFAULT_DATA_PARAMS, build_linear_model, build_scaler, is_linear_model, train_model
+)
+from instrumentation import instrumentation
+
+# Bump whenever the on-disk layout changes so old artifacts are ignored
+STORE_VERSION = 1
+
+DEFAULT_STORE_DIR = os.environ.get(
+    'HOUSE_PRICE_MODEL_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'model_cache')
+)
+
+# Parameters chosen by model selection, used whenever no explicit params are given
+PROMOTED_FILE = 'promoted.json'
+
+# Anything a missing, truncated or stale artifact can raise while it is being read;
+# all of them mean "not cached", never a failure
+_LOAD_ERRORS = (OSError, ValueError, KeyError, EOFError, pickle.UnpicklingError)
+
+
+def schema_hash(feature_names):
+    return hashlib.sha256('|'.join(feature_names).encode('utf-8')).hexdigest()[:16]
+
+
+def cache_key(params=None, feature_names=FEATURES):
+    # Anything that changes the fitted model must be part of the key
+    params = dict(DEFAULT_DATA_PARAMS, **(params or {}))
+    if params['dataset']:
+        # Only the path: the key must not depend on the working directory or on the
+        # file still being there (see _dataset_source)
+        params['dataset'] = os.path.abspath(params['dataset'])
+    payload = json.dumps({
+        'store_version': STORE_VERSION,
+        'params': params,
+        'schema': schema_hash(feature_names)
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:24]
+
+
+def _dataset_source(params):
+    # Fingerprint of the dataset CSV params train on, or None for synthetic data or a
+    # CSV that is no longer there. Artifacts record it when they are written; on load,
+    # a CSV that exists and has changed since means new data, so the artifact is stale,
+    # while a missing one leaves the saved artifact as the only copy of the model.
+    params = dict(DEFAULT_DATA_PARAMS, **(params or {}))
+    if not params['dataset']:
+        return None
+    try:
+        return source_fingerprint(params['dataset'])
+    except OSError:
+        return None
+
+
+def _write_artifact(store_dir, key, write):
+    # Write into a scratch directory first so a crash never leaves half an artifact behind
+    target = os.path.join(store_dir, key)
+    os.makedirs(store_dir, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix='.tmp-', dir=store_dir)
+    try:
+        meta = write(tmp_dir)
+        with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+            json.dump(meta, f, indent=2, sort_keys=True)
+
+        if os.path.isdir(target):
+            shutil.rmtree(target)
+        os.replace(tmp_dir, target)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return target
+
+
+def _read_meta(path, key, feature_names, params=None):
+    # The artifact's meta.json if it was written for this key and feature order, and
+    # from the current version of params' dataset, else None
+    with open(os.path.join(path, 'meta.json')) as f:
+        meta = json.load(f)
+    if meta.get('store_version') != STORE_VERSION or meta.get('key') != key:
+        return None
+    if meta.get('features') != list(feature_names):
+        return None
+    source = _dataset_source(params)
+    if source is not None and meta.get('source') != source:
+        return None
+    return meta
+
+
+def save_model(scaler, model, params=None, feature_names=FEATURES, store_dir=DEFAULT_STORE_DIR):
+    params = dict(DEFAULT_DATA_PARAMS, **(params or {}))
+    key = cache_key(params, feature_names)
+
+    def write(tmp_dir):
+        np.save(os.path.join(tmp_dir, 'scaler_mean.npy'), np.asarray(scaler.mean_, dtype=np.float64))
+        np.save(os.path.join(tmp_dir, 'scaler_var.npy'), np.asarray(scaler.var_, dtype=np.float64))
+        meta = {
+            'store_version': STORE_VERSION,
+            'key': key,
+            'params': params,
+            'features': list(feature_names),
+            'schema_hash': schema_hash(feature_names),
+            'source': _dataset_source(params),
+            'n_samples_seen': int(np.max(scaler.n_samples_seen_))
+        }
+        if is_linear_model(model):
+            np.save(os.path.join(tmp_dir, 'coef.npy'), np.asarray(model.coef_, dtype=np.float64))
+            meta['kind'] = 'linear'
+            meta['intercept'] = float(model.intercept_)
+        else:
+            # Tree ensembles have no coefficient arrays to memory-map
+            with open(os.path.join(tmp_dir, 'model.pkl'), 'wb') as f:
+                pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+            meta['kind'] = 'pickle'
+        return meta
+
+    return _write_artifact(store_dir, key, write)
+
+
+def load_model(params=None, feature_names=FEATURES, store_dir=DEFAULT_STORE_DIR):
+    # Returns (scaler, model) or None when there is no valid artifact for this key
+    key = cache_key(params, feature_names)
+    path = os.path.join(store_dir, key)
+    try:
+        meta = _read_meta(path, key, feature_names, params)
+        if meta is None:
+            return None
+
+        # Coefficients are memory-mapped rather than read, so loading is just a few page faults
+        mean = np.load(os.path.join(path, 'scaler_mean.npy'), mmap_mode='r')
+        var = np.load(os.path.join(path, 'scaler_var.npy'), mmap_mode='r')
+        if meta.get('kind', 'linear') == 'linear':
+            coef = np.load(os.path.join(path, 'coef.npy'), mmap_mode='r')
+            if coef.shape != (len(feature_names),):
+                return None
+            # Rebuild the fitted regressor from its learned attributes instead of unpickling
+            model = build_linear_model(coef, meta['intercept'])
+        else:
+            with open(os.path.join(path, 'model.pkl'), 'rb') as f:
+                model = pickle.load(f)
+    except _LOAD_ERRORS:
+        return None
+
+    if mean.shape != (len(feature_names),):
+        return None
+    return build_scaler(mean, var, meta['n_samples_seen']), model
+
+
+def active_params(store_dir=DEFAULT_STORE_DIR):
+    # The promoted parameters if model selection has promoted a model, else the defaults
+    try:
+        with open(os.path.join(store_dir, PROMOTED_FILE)) as f:
+            promoted = json.load(f)
+    except (OSError, ValueError):
+        return dict(DEFAULT_DATA_PARAMS)
+    return dict(DEFAULT_DATA_PARAMS, **promoted.get('params', {}))
+
+
+def promote_model(params, scaler=None, model=None, feature_names=FEATURES, store_dir=DEFAULT_STORE_DIR,
+                  report=None):
+    # Make `params` the default for every later load_or_train(); saving the already
+    # fitted estimators means the next start does not have to retrain
+    params = dict(DEFAULT_DATA_PARAMS, **params)
+    if scaler is not None and model is not None:
+        save_model(scaler, model, params, feature_names, store_dir)
+    os.makedirs(store_dir, exist_ok=True)
+    tmp_path = os.path.join(store_dir, PROMOTED_FILE + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump({'params': params, 'key': cache_key(params, feature_names), 'report': report},
+                  f, indent=2, sort_keys=True)
+    os.replace(tmp_path, os.path.join(store_dir, PROMOTED_FILE))
+
+
+def load_or_train(params=None, feature_names=FEATURES, store_dir=DEFAULT_STORE_DIR):
+    if params is None:
+        params = active_params(store_dir)
+    with instrumentation.timer('model.load'):
+        loaded = load_model(params, feature_names, store_dir)
+    if loaded is not None:
+        return loaded
+
+    scaler, model = train_model(params)
+    try:
+        with instrumentation.timer('model.save'):
+            save_model(scaler, model, params, feature_names, store_dir)
+    except OSError:
+        # A read-only install can still run, it just retrains on every start
+        pass
+    return scaler, model
+
+
+def _ensemble_key(params, n_replicas, seed, feature_names):
+    params = dict(DEFAULT_DATA_PARAMS, **(params or {}))
+    return cache_key(dict(params, bootstrap_replicas=n_replicas, bootstrap_seed=seed), feature_names)
+
+
+def save_ensemble(ensemble, params=None, seed=0, feature_names=FEATURES, store_dir=DEFAULT_STORE_DIR):
+    key = _ensemble_key(params, ensemble.n_replicas, seed, feature_names)
+
+    def write(tmp_dir):
+        np.save(os.path.join(tmp_dir, 'weights.npy'), ensemble.weights)
+        np.save(os.path.join(tmp_dir, 'biases.npy'), ensemble.biases)
+        np.save(os.path.join(tmp_dir, 'residuals.npy'), ensemble.residuals)
+        return {
+            'store_version': STORE_VERSION,
+            'key': key,
+            'kind': 'bootstrap',
+            'features': list(feature_names),
+            'source': _dataset_source(params),
+            'n_replicas': ensemble.n_replicas
+        }
+
+    return _write_artifact(store_dir, key, write)
+
+
+def load_ensemble(params=None, n_replicas=DEFAULT_REPLICAS, seed=0, feature_names=FEATURES,
+                  store_dir=DEFAULT_STORE_DIR):
+    # Returns a BootstrapEnsemble or None when there is no valid artifact for this key
+    key = _ensemble_key(params, n_replicas, seed, feature_names)
+    path = os.path.join(store_dir, key)
+    try:
+        if _read_meta(path, key, feature_names, params) is None:
+            return None
+        weights = np.load(os.path.join(path, 'weights.npy'), mmap_mode='r')
+        biases = np.load(os.path.join(path, 'biases.npy'), mmap_mode='r')
+        residuals = np.load(os.path.join(path, 'residuals.npy'))
+    except _LOAD_ERRORS:
+        return None
+
+    if weights.shape != (n_replicas, len(feature_names)) or biases.shape != (n_replicas,):
+        return None
+    return BootstrapEnsemble(weights, biases, residuals)
+
+
+def load_or_train_ensemble(params=None, n_replicas=DEFAULT_REPLICAS, seed=0, feature_names=FEATURES,
+                           store_dir=DEFAULT_STORE_DIR, max_workers=None):
+    if params is None:
+        params = active_params(store_dir)
+    loaded = load_ensemble(params, n_replicas, seed, feature_names, store_dir)
+    if loaded is not None:
+        return loaded
+
+    ensemble = train_bootstrap(params, n_replicas, max_workers, seed)
+    try:
+        save_ensemble(ensemble, params, seed, feature_names, store_dir)
+    except OSError:
+        pass
+    return ensemble
+
+
+def _comparables_key(params, feature_names):
+    # The index depends on the training rows only, so switching regressor reuses it
+    params = dict(DEFAULT_DATA_PARAMS, **(params or {}))
+    return cache_key(dict(params, model=None, index='comparables'), feature_names)
+
+
+def save_comparables(index, params=None, feature_names=FEATURES, store_dir=DEFAULT_STORE_DIR):
+    key = _comparables_key(params, feature_names)
+
+    def write(tmp_dir):
+        np.save(os.path.join(tmp_dir, 'rows.npy'), index.rows)
+        np.save(os.path.join(tmp_dir, 'prices.npy'), index.prices)
+        np.save(os.path.join(tmp_dir, 'mean.npy'), index.mean)
+        np.save(os.path.join(tmp_dir, 'scale.npy'), index.scale)
+        # The fitted tree (node bounds and row order) so loading never rebuilds it
+        with open(os.path.join(tmp_dir, 'tree.pkl'), 'wb') as f:
+            pickle.dump(index.tree, f, protocol=pickle.HIGHEST_PROTOCOL)
+        return {
+            'store_version': STORE_VERSION,
+            'key': key,
+            'kind': 'comparables',
+            'features': list(feature_names),
+            'source': _dataset_source(params),
+            'n_rows': index.n_rows
+        }
+
+    return _write_artifact(store_dir, key, write)
+
+
+def load_comparables(params=None, feature_names=FEATURES, store_dir=DEFAULT_STORE_DIR):
+    # Returns a ComparablesIndex or None when there is no valid artifact for this key
+    key = _comparables_key(params, feature_names)
+    path = os.path.join(store_dir, key)
+    try:
+        meta = _read_meta(path, key, feature_names, params)
+        if meta is None:
+            return None
+        # Rows and prices are only read for the few neighbours each query returns
+        rows = np.load(os.path.join(path, 'rows.npy'), mmap_mode='r')
+        prices = np.load(os.path.join(path, 'prices.npy'), mmap_mode='r')
+        mean = np.load(os.path.join(path, 'mean.npy'))
+        scale = np.load(os.path.join(path, 'scale.npy'))
+        with open(os.path.join(path, 'tree.pkl'), 'rb') as f:
+            tree = pickle.load(f)
+    except _LOAD_ERRORS:
+        return None
+
+    if rows.shape != (meta['n_rows'], len(feature_names)) or prices.shape != (meta['n_rows'],):
+        return None
+    return ComparablesIndex(rows, prices, mean, scale, tree)
+
+
+def load_or_build_comparables(params=None, feature_names=FEATURES, store_dir=DEFAULT_STORE_DIR):
+    if params is None:
+        params = active_params(store_dir)
+    with instrumentation.timer('comparables.load'):
+        loaded = load_comparables(params, feature_names, store_dir)
+    if loaded is not None:
+        return loaded
+
+    with instrumentation.timer('comparables.build'):
+        index = build_comparables(params)
+    try:
+        save_comparables(index, params, feature_names, store_dir)
+    except OSError:
+        pass
+    return index
+
@@ -0,0 +1,152 @@
+import math
+import threading
+from collections import deque
+
+import numpy as np
+
+from house_model import FEATURES, FusedPredictor, RunningStats, build_estimators, training_stats
+from sales_log import DEFAULT_SALES_PATH, open_sales_log
+
+# With decay, a batch whose weight has fallen below this fraction of a new row's no
+# longer moves the fit, so it is dropped from the sales log
+DECAY_FLOOR = 1e-12
+
+
+class OnlineModel:
+    # The linear model kept as its sufficient statistics (RunningStats), so labelled rows
+    # such as recorded sale prices can be folded in as they arrive: O(features^2) per
+    # batch plus one pass over the batch, with no retraining from scratch.
+    #
+    # Each update builds a brand-new FusedPredictor and publishes it to subscribers;
+    # predictors are never modified in place, so readers holding the old one keep
+    # getting consistent answers and the swap is a single reference assignment.
+    #
+    # decay: every update first multiplies the weight of all earlier rows by this
+    #        factor (e.g. 0.99), so old sales fade out gradually.
+    # window: keep only about this many of the most recent rows; whole batches (the
+    #         initial training set counts as one) are dropped once enough newer rows exist.
+    # sales_log: a SalesLog each update appends its batch to; from_params replays it, so
+    #            a restart does not lose the sales. Batches that have left the window,
+    #            or decayed below DECAY_FLOOR, are pruned from it. None keeps them in memory.
+
+    def __init__(self, stats, decay=None, window=None, sales_log=None):
+        if decay is not None and window is not None:
+            raise ValueError("Use either decay or window, not both")
+        if decay is not None and not 0 < decay <= 1:
+            raise ValueError("decay must be in (0, 1]")
+        if window is not None and window < 2:
+            raise ValueError("window must keep at least two rows")
+        self.decay = decay
+        self.window = window
+        self.updates = 0
+        self.sales_log = sales_log
+        # Rows recorded through update(), including replayed ones, that the fit still uses
+        self.n_sales = 0
+        self._stats = stats.copy()
+        self._batches = deque([stats.copy()]) if window is not None else None
+        # (log id, rows) of the batches the fit still uses, oldest first, so those it
+        # stops using can be pruned from the log; the training set is (None, 0). None
+        # when every batch counts forever, so nothing is ever pruned.
+        self._horizon = None
+        if decay is not None and decay < 1:
+            self._horizon = math.ceil(math.log(DECAY_FLOOR) / math.log(decay))
+        self._recorded = None
+        if window is not None:
+            self._recorded = deque([(None, 0)])
+        elif self._horizon is not None:
+            self._recorded = deque()
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self.scaler, self.model, self.predictor = self._solve(self._stats)
+
+    @classmethod
+    def from_params(cls, params=None, decay=None, window=None, sales_path=DEFAULT_SALES_PATH):
+        # Start from the same training rows train_model fits, then replay the sales
+        # recorded so far, batch by batch as they arrived
+        sales_log = None if sales_path is None else open_sales_log(sales_path)
+        online = cls(training_stats(params), decay, window, sales_log)
+        if sales_log is not None:
+            stats, batches = online._stats, online._batches
+            for batch_id, X, y in sales_log.batches():
+                stats, batches, dropped = online._fold(stats, batches, X, y)
+                online._track(batch_id, len(y), dropped)
+                online.updates += 1
+            online._stats, online._batches = stats, batches
+            online.scaler, online.model, online.predictor = online._solve(stats)
+        return online
+
+    def subscribe(self, callback):
+        # callback(predictor) runs on the updating thread after every update
+        self._subscribers.append(callback)
+
+    @property
+    def n_rows(self):
+        # Effective number of rows behind the current fit (fractional with decay)
+        return self._stats.count
+
+    def update(self, X, y):
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64).ravel()
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape != (len(y), len(FEATURES)):
+            raise ValueError(f"Expected ({len(y)}, {len(FEATURES)}) rows for {len(y)} prices, got {X.shape}")
+        if not len(y):
+            return self.predictor
+
+        with self._lock:
+            # Folded into copies of the stats and the window, so a failed solve leaves
+            # the published model, and the batches behind it, untouched
+            stats, batches, dropped = self._fold(self._stats, self._batches, X, y)
+            try:
+                solved = self._solve(stats)
+            except np.linalg.LinAlgError as e:
+                raise ValueError(f"Could not refit the model on these rows: {e}")
+            self._stats = stats
+            self._batches = batches
+            self.scaler, self.model, self.predictor = solved
+            self.updates += 1
+            predictor = self.predictor
+            # One appended batch, so the cost does not grow with the sales recorded
+            batch_id = None if self.sales_log is None else self.sales_log.append(X, y)
+            self._track(batch_id, len(y), dropped)
+
+        for callback in self._subscribers:
+            callback(predictor)
+        return predictor
+
+    def _fold(self, stats, batches, X, y):
+        # (stats, batches, dropped) with one more batch of rows, leaving the arguments
+        # unchanged; dropped counts the oldest batches that fell out of the window
+        stats = stats.copy()
+        batch = RunningStats(len(FEATURES)).update(X, y)
+        if self.decay is not None:
+            stats.decay(self.decay)
+        stats.merge(batch)
+        dropped = 0
+        if batches is not None:
+            batches = deque(batches)
+            batches.append(batch)
+            while len(batches) > 1 and stats.count - batches[0].count >= self.window:
+                stats.remove(batches.popleft())
+                dropped += 1
+        return stats, batches, dropped
+
+    def _track(self, batch_id, n_rows, dropped):
+        # Count a committed batch, and prune the batches the fit no longer uses from the log
+        self.n_sales += n_rows
+        if self._recorded is None:
+            return
+        self._recorded.append((batch_id, n_rows))
+        gone = [self._recorded.popleft() for _ in range(dropped)]
+        while self._horizon is not None and len(self._recorded) > self._horizon:
+            gone.append(self._recorded.popleft())
+        self.n_sales -= sum(rows for _, rows in gone)
+        logged = [batch_id for batch_id, _ in gone if batch_id is not None]
+        if logged and self.sales_log is not None:
+            self.sales_log.prune(max(logged))
+
+    def _solve(self, stats):
+        mean, var, coef, intercept = stats.solve()
+        scaler, model = build_estimators(mean, var, int(stats.count), coef, intercept)
+        return scaler, model, FusedPredictor.from_pipeline(scaler, model)
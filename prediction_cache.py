@@ -0,0 +1,94 @@
+import threading
+from collections import OrderedDict
+
+
+def canonical_key(values):
+    # "1200", "1200.0" and 1200 all describe the same property
+    return tuple(float(value) + 0.0 for value in values)
+
+
+def _predict_scalar(predictor, key):
+    return predictor.predict_scalar(key)
+
+
+class PredictionCache:
+    # Bounded LRU of predictions keyed on the canonical feature tuple. Swapping the
+    # predictor (retrain or reload) bumps the generation and empties the cache, so a
+    # stale price is never served. Thread-safe, so the GUI and the HTTP service can share one.
+
+    def __init__(self, predictor=None, maxsize=4096):
+        self.maxsize = maxsize
+        self.predictor = predictor
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def set_predictor(self, predictor):
+        with self._lock:
+            self.predictor = predictor
+            self.generation += 1
+            self._entries.clear()
+
+    def current(self):
+        # (predictor, generation) read together, so a prediction made with this
+        # predictor is never stored under a later generation
+        with self._lock:
+            return self.predictor, self.generation
+
+    def lookup(self, values):
+        # Returns the cached prediction or None, counting the hit or miss
+        return self._get(canonical_key(values))
+
+    def store(self, values, prediction, generation=None):
+        # `generation` is the one the prediction was computed under; results from a
+        # predictor that has since been replaced are dropped
+        self._put(canonical_key(values), prediction, generation)
+
+    def predict(self, values):
+        return self.get_or_compute(values, _predict_scalar)
+
+    def get_or_compute(self, values, compute):
+        # Cached result for values, else compute(predictor, key), stored under the
+        # generation of the predictor it was computed with. The "predictor" can be
+        # anything compute understands, e.g. a bundle of models behind one valuation.
+        key = canonical_key(values)
+        cached = self._get(key)
+        if cached is not None:
+            return cached
+        predictor, generation = self.current()
+        result = compute(predictor, key)
+        self._put(key, result, generation)
+        return result
+
+    def _get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def _put(self, key, prediction, generation):
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[key] = prediction
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'generation': self.generation
+            }
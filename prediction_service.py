@@ -0,0 +1,321 @@
+import argparse
+import ipaddress
+import json
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from feature_schema import ValidationError, default_validator
+from house_model import FEATURES, make_predictor
+from model_store import active_params, load_or_train
+from online_model import OnlineModel
+from prediction_cache import PredictionCache
+
+# A 400 response lists at most this many invalid (instance, feature) cells
+MAX_REPORTED_VIOLATIONS = 100
+
+
+class _PendingRequest:
+    __slots__ = ('rows', 'future', 'enqueued')
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.future = Future()
+        self.enqueued = time.perf_counter()
+
+
+class MicroBatcher:
+    # Coalesces requests arriving within `window_ms` into one vectorized predict call
+
+    def __init__(self, predictor, window_ms=3.0, max_batch=1024, latency_samples=10000, cache=None):
+        self.predictor = predictor
+        self.cache = cache
+        if cache is not None:
+            cache.set_predictor(predictor)
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=latency_samples)
+        self._batch_sizes = {}
+        self._requests = 0
+        self._batches = 0
+        self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def set_predictor(self, predictor):
+        self.predictor = predictor
+        if self.cache is not None:
+            self.cache.set_predictor(predictor)
+
+    def submit(self, rows):
+        rows = np.asarray(rows, dtype=np.float64)
+        if rows.ndim == 1:
+            rows = rows.reshape(1, -1)
+        if rows.ndim != 2 or rows.shape[1] != len(FEATURES):
+            raise ValueError(f"Each row needs {len(FEATURES)} values")
+        if self.cache is not None and len(rows) == 1:
+            cached = self.cache.lookup(rows[0])
+            if cached is not None:
+                future = Future()
+                future.set_result([cached])
+                return future
+        pending = _PendingRequest(rows)
+        self._queue.put(pending)
+        return pending.future
+
+    def predict(self, rows, timeout=None):
+        return self.submit(rows).result(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            batch = [first]
+            n_rows = len(first.rows)
+            deadline = time.perf_counter() + self.window
+            while n_rows < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                n_rows += len(item.rows)
+
+            self._flush(batch, n_rows)
+
+    def _flush(self, batch, n_rows):
+        # Read the predictor once so a concurrent model swap cannot split a batch. With a
+        # cache, predictor and generation are read together under its lock: reading them
+        # separately could store the old model's prices under the new generation.
+        if self.cache is not None:
+            predictor, generation = self.cache.current()
+        else:
+            predictor, generation = self.predictor, None
+        try:
+            X = batch[0].rows if len(batch) == 1 else np.vstack([item.rows for item in batch])
+            predictions = predictor.predict(X)
+        except Exception as e:
+            for item in batch:
+                item.future.set_exception(e)
+            return
+
+        done = time.perf_counter()
+        offset = 0
+        for item in batch:
+            count = len(item.rows)
+            result = predictions[offset:offset + count].tolist()
+            if self.cache is not None and count == 1:
+                self.cache.store(item.rows[0], result[0], generation)
+            item.future.set_result(result)
+            offset += count
+
+        with self._lock:
+            self._batches += 1
+            self._requests += len(batch)
+            bucket = 1 << (n_rows - 1).bit_length()
+            self._batch_sizes[bucket] = self._batch_sizes.get(bucket, 0) + 1
+            self._latencies.extend(done - item.enqueued for item in batch)
+
+    def metrics(self):
+        with self._lock:
+            latencies = np.array(self._latencies)
+            histogram = dict(sorted(self._batch_sizes.items()))
+            requests, batches = self._requests, self._batches
+
+        if len(latencies):
+            p50, p99 = np.percentile(latencies, [50, 99]) * 1000.0
+        else:
+            p50 = p99 = 0.0
+        return {
+            'queue_depth': self._queue.qsize(),
+            'cache': self.cache.stats() if self.cache is not None else None,
+            'requests': requests,
+            'batches': batches,
+            'batch_size_histogram': {f"<={size}": count for size, count in histogram.items()},
+            'latency_ms': {'p50': float(p50), 'p99': float(p99)},
+            'window_ms': self.window * 1000.0
+        }
+
+
+class PredictionRequestHandler(BaseHTTPRequestHandler):
+    server_version = 'HousePriceService/1.0'
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send_json(200, {'status': 'ok'})
+        elif self.path == '/metrics':
+            metrics = self.server.batcher.metrics()
+            online = self.server.online
+            if online is not None:
+                metrics['online'] = {'updates': online.updates, 'model_rows': float(online.n_rows)}
+            self._send_json(200, metrics)
+        else:
+            self._send_json(404, {'error': f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path not in ('/predict', '/observe'):
+            self._send_json(404, {'error': f"Unknown path {self.path}"})
+            return
+        if self.path == '/observe' and self.server.online is None:
+            self._send_json(404, {'error': "Online updates are off (start the service with --online)"})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length) or b'{}')
+            rows = parse_rows(payload)
+            default_validator.check(rows)
+            if self.path == '/observe':
+                body = self._observe(rows, payload)
+            else:
+                body = {'predictions': self.server.batcher.predict(rows, timeout=self.server.request_timeout)}
+        except ValidationError as e:
+            self._send_json(400, {
+                'error': str(e),
+                'violations': [
+                    {'instance': row, 'feature': feature, 'value': value, 'reason': reason}
+                    for row, feature, value, reason in e.report.violations(MAX_REPORTED_VIOLATIONS)
+                ]
+            })
+            return
+        except (ValueError, TypeError, KeyError) as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        except Exception as e:
+            self._send_json(500, {'error': str(e)})
+            return
+        self._send_json(200, body)
+
+    def _observe(self, rows, payload):
+        # Recorded sale prices for the given instances, folded into the live model
+        prices = [float(price) for price in payload.get('prices', [])]
+        if len(prices) != len(rows):
+            raise ValueError(f"Need one price per instance: got {len(prices)} prices for {len(rows)} instances")
+        if not all(np.isfinite(price) and price > 0 for price in prices):
+            raise ValueError("Prices must be positive numbers")
+        online = self.server.online
+        online.update(rows, prices)
+        return {'observed': len(rows), 'updates': online.updates, 'model_rows': float(online.n_rows)}
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def parse_rows(payload):
+    # Accepts {"features": {...}} / {"features": [...]} for one property
+    # or {"instances": [...]} for several, each as a dict or a list in FEATURES order
+    if 'instances' in payload:
+        instances = payload['instances']
+    elif 'features' in payload:
+        instances = [payload['features']]
+    else:
+        raise ValueError("Request body needs 'features' or 'instances'")
+
+    rows = []
+    for instance in instances:
+        if isinstance(instance, dict):
+            missing = [feature for feature in FEATURES if feature not in instance]
+            if missing:
+                raise ValueError(f"Missing features: {', '.join(missing)}")
+            rows.append([float(instance[feature]) for feature in FEATURES])
+        else:
+            rows.append([float(value) for value in instance])
+    if not rows:
+        raise ValueError("No instances to predict")
+    return rows
+
+
+class PredictionServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Bursts of concurrent clients are the whole point, so allow a deep accept backlog
+    request_queue_size = 128
+
+    def __init__(self, predictor, host='127.0.0.1', port=8765, window_ms=3.0,
+                 max_batch=1024, request_timeout=5.0, verbose=False, cache=None, online=None):
+        # Never listen beyond the local machine
+        if host != 'localhost' and not ipaddress.ip_address(host).is_loopback:
+            raise ValueError(f"Refusing to bind to non-loopback address {host}")
+        super().__init__((host, port), PredictionRequestHandler)
+        self.batcher = MicroBatcher(predictor, window_ms, max_batch, cache=cache).start()
+        # With an OnlineModel, POST /observe refits it and every refit is swapped into
+        # the batcher; requests already in a batch finish on the predictor they started with
+        self.online = online
+        if online is not None:
+            online.subscribe(self.batcher.set_predictor)
+        self.request_timeout = request_timeout
+        self.verbose = verbose
+
+    def server_close(self):
+        super().server_close()
+        self.batcher.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve house price predictions over local HTTP/JSON.")
+    parser.add_argument('--host', default='127.0.0.1', help="loopback address to bind (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--window-ms', type=float, default=3.0, help="micro-batching window (default: 3 ms)")
+    parser.add_argument('--max-batch', type=int, default=1024, help="rows per batch before flushing early")
+    parser.add_argument('--cache-size', type=int, default=4096, help="LRU entries for repeat lookups (0 disables)")
+    parser.add_argument('--verbose', action='store_true', help="log every request")
+    parser.add_argument('--online', action='store_true',
+                        help="accept recorded sale prices on POST /observe and refit the linear model live")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--decay', type=float, help="with --online, weight of earlier rows after each update (e.g. 0.99)")
+    group.add_argument('--window', type=int, help="with --online, keep only about this many recent rows")
+    args = parser.parse_args(argv)
+
+    online = None
+    if args.online:
+        online = OnlineModel.from_params(active_params(), args.decay, args.window)
+        predictor = online.predictor
+    else:
+        predictor = make_predictor(*load_or_train())
+    server = PredictionServer(
+        predictor,
+        args.host, args.port, args.window_ms, args.max_batch, verbose=args.verbose,
+        cache=PredictionCache(maxsize=args.cache_size) if args.cache_size > 0 else None,
+        online=online
+    )
+    paths = "POST /predict, POST /observe, GET /metrics" if online else "POST /predict, GET /metrics"
+    print(f"Serving on http://{args.host}:{server.server_address[1]} ({paths})", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+import numpy as np
+
+from feature_schema import FEATURES
+
+# Next to the saved models, so HOUSE_PRICE_MODEL_DIR moves both
+DEFAULT_SALES_PATH = os.environ.get(
+    'HOUSE_PRICE_SALES_DB',
+    os.path.join(
+        os.environ.get('HOUSE_PRICE_MODEL_DIR',
+                       os.path.join(os.path.dirname(os.path.abspath(__file__)), 'model_cache')),
+        'recorded_sales.sqlite3'
+    )
+)
+
+FEATURE_COLUMNS = [feature.lower() for feature in FEATURES]
+
+# AUTOINCREMENT so a batch id is never reused after older batches are pruned; ids
+# give the order the batches were recorded in, across every process sharing the file
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS sale_batches (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    recorded_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sales (
+    id INTEGER PRIMARY KEY,
+    batch_id INTEGER NOT NULL,
+    {', '.join(f'{column} REAL NOT NULL' for column in FEATURE_COLUMNS)},
+    price REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sales_batch ON sales (batch_id);
+"""
+
+INSERT = (
+    f"INSERT INTO sales (batch_id, {', '.join(FEATURE_COLUMNS)}, price) "
+    f"VALUES ({', '.join('?' * (len(FEATURE_COLUMNS) + 2))})"
+)
+
+
+def _connect(path):
+    # Shared by the threads of one OnlineModel, which serialise on SalesLog._lock
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')
+    return connection
+
+
+class SalesLog:
+    # Every recorded sale price, one row per sale, grouped into the batches they were
+    # recorded in. Each update appends its batch in one transaction, so the cost does
+    # not grow with the history, and processes sharing the file (the app and the
+    # service) add to it side by side rather than overwriting each other.
+
+    def __init__(self, path=DEFAULT_SALES_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = _connect(path)
+        self._connection.executescript(SCHEMA)
+
+    def append(self, X, y):
+        # The new batch's id, or None if it could not be saved; a failed write keeps
+        # the sale for this run only
+        rows = [(*map(float, row), float(price)) for row, price in zip(X, y)]
+        try:
+            with self._lock, self._connection:
+                batch_id = self._connection.execute(
+                    'INSERT INTO sale_batches (recorded_at) VALUES (?)', (time.time(),)
+                ).lastrowid
+                self._connection.executemany(INSERT, [(batch_id, *row) for row in rows])
+        except sqlite3.Error as e:
+            print(f"Could not save {len(rows)} recorded sales: {e}", file=sys.stderr)
+            return None
+        return batch_id
+
+    def prune(self, batch_id):
+        # Drop this batch and every older one
+        try:
+            with self._lock, self._connection:
+                self._connection.execute('DELETE FROM sales WHERE batch_id <= ?', (batch_id,))
+                self._connection.execute('DELETE FROM sale_batches WHERE id <= ?', (batch_id,))
+        except sqlite3.Error as e:
+            print(f"Could not prune recorded sales: {e}", file=sys.stderr)
+
+    def batches(self):
+        # [(batch_id, X, y)] of every saved batch, oldest first
+        with self._lock:
+            data = np.array(self._connection.execute(
+                f"SELECT batch_id, {', '.join(FEATURE_COLUMNS)}, price FROM sales ORDER BY batch_id, id"
+            ).fetchall(), dtype=np.float64).reshape(-1, len(FEATURE_COLUMNS) + 2)
+        starts = np.flatnonzero(np.diff(data[:, 0], prepend=-1.0))
+        return [
+            (int(data[start, 0]), data[start:stop, 1:-1], data[start:stop, -1])
+            for start, stop in zip(starts, np.append(starts[1:], len(data)))
+        ]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+def open_sales_log(path=DEFAULT_SALES_PATH):
+    # A SalesLog, or None when the file cannot be opened (e.g. a read-only install)
+    try:
+        return SalesLog(path)
+    except (OSError, sqlite3.Error) as e:
+        print(f"Could not open the sales log {path}: {e}", file=sys.stderr)
+        return None
@@ -0,0 +1,134 @@
+import numpy as np
+
+from feature_schema import FEATURE_SCHEMA, FEATURES
+
+# Sweep range (the span of the training data) and a neutral default for every input
+SWEEP_RANGES = {spec.name: (*spec.typical, spec.default) for spec in FEATURE_SCHEMA}
+
+
+def sweep_values(feature, points=60):
+    low, high, _ = SWEEP_RANGES[feature]
+    return np.linspace(low, high, points)
+
+
+class SweepGrid:
+    # Feature matrix for a 1-D or 2-D what-if sweep, built once. Moving a held input
+    # (e.g. from a slider) only rewrites one column in place, and every evaluation is
+    # a single vectorized predict over the whole grid.
+
+    def __init__(self, base_values, feature_x, values_x, feature_y=None, values_y=None):
+        self.feature_x = feature_x
+        self.feature_y = feature_y
+        self.values_x = np.asarray(values_x, dtype=np.float64)
+        self.values_y = None if feature_y is None else np.asarray(values_y, dtype=np.float64)
+
+        n_x = len(self.values_x)
+        n_y = 1 if feature_y is None else len(self.values_y)
+        self.shape = (n_x,) if feature_y is None else (n_y, n_x)
+
+        self.matrix = np.tile(np.asarray(base_values, dtype=np.float64), (n_x * n_y, 1))
+        self.matrix[:, FEATURES.index(feature_x)] = np.tile(self.values_x, n_y)
+        if feature_y is not None:
+            self.matrix[:, FEATURES.index(feature_y)] = np.repeat(self.values_y, n_x)
+
+    def set_value(self, feature, value):
+        if feature in (self.feature_x, self.feature_y):
+            raise ValueError(f"{feature} is swept and cannot be held at one value")
+        self.matrix[:, FEATURES.index(feature)] = value
+
+    def evaluate(self, predictor):
+        return predictor.predict(self.matrix).reshape(self.shape)
+
+
+class SensitivityChart:
+    # Matplotlib figure embedded in a Tk widget. The artists are created once per sweep
+    # layout; later updates change their data and blit only the axes area, so
+    # dragging a slider never rebuilds or fully redraws the figure.
+
+    def __init__(self, master, facecolor='#0A0A0A', accent='#FF2E63', text_color='#FFFFFF'):
+        # Imported here so the headless sweep code never pulls in matplotlib
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+        self.accent = accent
+        self.text_color = text_color
+        self.figure = Figure(figsize=(7, 4.5), dpi=100, facecolor=facecolor)
+        self.axes = self.figure.add_subplot(111, facecolor=facecolor)
+        self.canvas = FigureCanvasTkAgg(self.figure, master=master)
+        self.widget = self.canvas.get_tk_widget()
+        self.artist = None
+        self.colorbar = None
+        self._layout = None
+        self._background = None
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+
+    def show(self, grid, prices):
+        layout = (grid.feature_x, grid.feature_y, grid.shape)
+        if layout != self._layout:
+            self._build(grid, prices)
+            self._layout = layout
+            return
+        self.update(prices)
+
+    def update(self, prices):
+        prices = np.asarray(prices) / 1e5  # lakh
+        low, high = float(prices.min()), float(prices.max())
+        if self._layout[1] is None:
+            self.artist.set_ydata(prices)
+            y_low, y_high = self.axes.get_ylim()
+            out_of_view = low < y_low or high > y_high
+        else:
+            self.artist.set_data(prices)
+            c_low, c_high = self.artist.get_clim()
+            out_of_view = low < c_low or high > c_high
+        if out_of_view or self._background is None:
+            # Limits have to grow: one full redraw, which also refreshes the blit background
+            self._rescale(low, high)
+            self.canvas.draw_idle()
+            return
+
+        self.canvas.restore_region(self._background)
+        self.axes.draw_artist(self.artist)
+        self.canvas.blit(self.axes.bbox)
+
+    def _build(self, grid, prices):
+        prices = np.asarray(prices) / 1e5
+        if self.colorbar is not None:
+            self.colorbar.remove()
+            self.colorbar = None
+        self.axes.clear()
+        # Stale until the next full draw has been captured
+        self._background = None
+
+        if grid.feature_y is None:
+            (self.artist,) = self.axes.plot(grid.values_x, prices, color=self.accent, linewidth=2, animated=True)
+            self.axes.set_ylabel('Price (₹ lakh)', color=self.text_color)
+        else:
+            extent = (grid.values_x[0], grid.values_x[-1], grid.values_y[0], grid.values_y[-1])
+            self.artist = self.axes.imshow(prices, origin='lower', aspect='auto', extent=extent,
+                                           cmap='magma', animated=True)
+            self.colorbar = self.figure.colorbar(self.artist, ax=self.axes)
+            self.colorbar.set_label('Price (₹ lakh)', color=self.text_color)
+            self.colorbar.ax.tick_params(colors=self.text_color)
+            self.axes.set_ylabel(grid.feature_y.replace('_', ' '), color=self.text_color)
+
+        self.axes.set_xlabel(grid.feature_x.replace('_', ' '), color=self.text_color)
+        self.axes.tick_params(colors=self.text_color)
+        for spine in self.axes.spines.values():
+            spine.set_color(self.text_color)
+        self._rescale(float(prices.min()), float(prices.max()))
+        self.canvas.draw_idle()
+
+    def _rescale(self, low, high):
+        # Leave headroom so small slider moves stay on the blit path
+        margin = max((high - low) * 0.25, abs(high) * 0.05, 1.0)
+        if self.colorbar is None:
+            self.axes.set_ylim(low - margin, high + margin)
+        else:
+            self.artist.set_clim(low - margin, high + margin)
+
+    def _on_draw(self, event):
+        # After a full draw, cache everything except the animated artist for blitting
+        self._background = self.canvas.copy_from_bbox(self.axes.bbox)
+        if self.artist is not None:
+            self.axes.draw_artist(self.artist)
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from currency import format_indian_currency, format_indian_currency_array
+
+
+def _amounts():
+    rng = np.random.RandomState(0)
+    edges = [0.0, -0.0, 0.004, -0.004, 0.005, 0.995, 999.0, 1000.0, -1000.0, 99999.0, 100000.0,
+             9999999.99, 1e7, -1e7, 2.0 ** 53, 9.2e18, -9.2e18, 1e19, -1e19, 1e25]
+    magnitudes = 10.0 ** rng.uniform(-2, 15, 120000)
+    signs = np.where(rng.random_sample(120000) < 0.2, -1.0, 1.0)
+    return np.concatenate([edges, np.round(magnitudes * signs, 2), np.floor(magnitudes)])
+
+
+@pytest.mark.parametrize('paise', [False, True])
+def test_array_formatter_matches_scalar(paise):
+    amounts = _amounts()
+    formatted = format_indian_currency_array(amounts, paise=paise)
+    expected = [format_indian_currency(amount, paise=paise) for amount in amounts.tolist()]
+    assert list(formatted) == expected
+
+
+def _integer_amounts(dtype):
+    info = np.iinfo(dtype)
+    rng = np.random.RandomState(1)
+    edges = [0, 1, 999, 1000, -1, -1000, 2 ** 31 - 1, -2 ** 31, 2 ** 53 + 1, -(2 ** 53 + 1),
+             90071992547409930, 2 ** 63 - 1, -2 ** 63, -2 ** 63 + 1, 2 ** 63, 2 ** 64 - 1]
+    magnitudes = 10.0 ** rng.uniform(0, np.log10(float(info.max)), 50000)
+    values = magnitudes.astype(np.uint64) // 1000 * 1000 + rng.randint(0, 1000, 50000).astype(np.uint64)
+    values = [min(int(value), int(info.max)) for value in values]
+    if info.min < 0:
+        values = [-value if i % 5 == 0 else value for i, value in enumerate(values)]
+    return np.array([edge for edge in edges if info.min <= edge <= info.max] + values, dtype=dtype)
+
+
+@pytest.mark.parametrize('paise', [False, True])
+@pytest.mark.parametrize('dtype', [np.int64, np.uint64, np.int32])
+def test_integer_array_formatter_matches_scalar(dtype, paise):
+    amounts = _integer_amounts(dtype)
+    formatted = format_indian_currency_array(amounts, paise=paise)
+    expected = [format_indian_currency(amount, paise=paise) for amount in amounts.tolist()]
+    assert list(formatted) == expected
+
+
+def test_array_formatter_keeps_shape():
+    amounts = np.array([[1234567.0, -89.0], [0.0, 1e12]])
+    formatted = format_indian_currency_array(amounts)
+    assert formatted.shape == amounts.shape
+    assert formatted.tolist() == [['12,34,567', '-89'], ['0', '10,00,00,00,00,000']]
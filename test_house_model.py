@@ -0,0 +1,17 @@
+import numpy as np
+import pytest
+
+from house_model import FusedPredictor, generate_delhi_data, train_model
+
+
+@pytest.mark.parametrize('model', ['linear', 'ridge', 'lasso'])
+def test_fused_predictor_matches_pipeline(model):
+    scaler, regressor = train_model({'n_samples': 5000, 'model': model})
+    predictor = FusedPredictor.from_pipeline(scaler, regressor)
+    X, _ = generate_delhi_data(2000, seed=7)
+    expected = regressor.predict(scaler.transform(X))
+
+    np.testing.assert_allclose(predictor.predict(X), expected, rtol=1e-9, atol=1e-3)
+    for row, price in zip(X[:50], expected[:50]):
+        assert predictor.predict_row(row) == pytest.approx(price, rel=1e-9, abs=1e-3)
+        assert predictor.predict_scalar(row.tolist()) == pytest.approx(price, rel=1e-9, abs=1e-3)
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from house_model import generate_delhi_data
+from online_model import OnlineModel
+
+
+@pytest.mark.parametrize('options', [{}, {'window': 300}, {'decay': 0.9}])
+def test_restart_replays_recorded_sales(tmp_path, options):
+    path = str(tmp_path / 'sales.sqlite3')
+    X, y = generate_delhi_data(600, seed=3)
+    online = OnlineModel.from_params(sales_path=path, **options)
+    for start in range(0, 600, 2):
+        online.update(X[start:start + 2], y[start:start + 2])
+
+    restarted = OnlineModel.from_params(sales_path=path, **options)
+    assert restarted.n_sales == online.n_sales
+    np.testing.assert_allclose(restarted.predictor.predict(X), online.predictor.predict(X), rtol=1e-9)
+    if options:
+        # Batches that left the window, or decayed away, are pruned from the log
+        assert sum(len(prices) for _, _, prices in restarted.sales_log.batches()) < 600
+
+
+def test_processes_sharing_the_log_keep_each_others_sales(tmp_path):
+    path = str(tmp_path / 'sales.sqlite3')
+    X, y = generate_delhi_data(3, seed=3)
+    app = OnlineModel.from_params(sales_path=path)
+    service = OnlineModel.from_params(sales_path=path)
+    app.update(X[:1], y[:1])
+    service.update(X[1:], y[1:])
+
+    restarted = OnlineModel.from_params(sales_path=path)
+    assert (restarted.n_sales, restarted.updates) == (3, 2)
@@ -0,0 +1,92 @@
+import os
+import time
+from functools import partial
+
+import pytest
+
+tk = pytest.importorskip('tkinter')
+
+SAMPLE_ROW = ['1200', '3', '2', '7', '5', '1', '0', '8']
+# Valuations pushed through the real popup, and the resident memory it may gain
+VALUATIONS = 5000
+RSS_GROWTH_LIMIT = 8 * 1024 * 1024
+READY_TIMEOUT_S = 120
+
+
+def _count_widgets(widget):
+    return 1 + sum(_count_widgets(child) for child in widget.winfo_children())
+
+
+def _rss_bytes():
+    # Current resident set size (Linux); None where /proc is not available
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+@pytest.fixture
+def root():
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        pytest.skip(f"needs a display: {e}")
+    yield root
+    root.destroy()
+
+
+@pytest.fixture
+def app(root, tmp_path, monkeypatch):
+    # The real app, with its models, history and sales kept out of the real caches
+    import HousePricePrediction as hpp
+    import model_store
+    from estimate_history import EstimateHistory
+
+    # The app imports these from model_store on its worker thread, when it calls them
+    store_dir = str(tmp_path / 'model_cache')
+    for name in ('active_params', 'load_or_train', 'load_or_train_ensemble', 'load_or_build_comparables'):
+        monkeypatch.setattr(model_store, name, partial(getattr(model_store, name), store_dir=store_dir))
+    monkeypatch.setattr(hpp, 'DEFAULT_SALES_PATH', str(tmp_path / 'recorded_sales.sqlite3'))
+    app = hpp.HousePricePredictionApp(root)
+    app.estimate_history = EstimateHistory(str(tmp_path / 'estimates.sqlite3'))
+    for var, value in zip(app.features.values(), SAMPLE_ROW):
+        var.set(value)
+
+    futures = [app.model_future, app.ensemble_future, app.comparables_future]
+    deadline = time.monotonic() + READY_TIMEOUT_S
+    while any(future is not None and not future.done() for future in futures) or app.predictor is None:
+        assert time.monotonic() < deadline, "model did not load"
+        root.update()
+        time.sleep(0.01)
+    root.update()
+    yield app
+    app.estimate_history.close()
+
+
+def test_result_popup_is_refilled_in_place(root, app):
+    # Every valuation has new inputs, so none is served from the valuation cache and
+    # each one retargets the popup; the popup is built once and refilled, so neither
+    # the widget count nor resident memory may grow with the number of valuations
+    square_footage = app.features['Square_Footage']
+
+    def valuation(value):
+        square_footage.set(str(value))
+        app.predict_price()
+        root.update()
+
+    # Warm up: build the popup and settle allocator pools before the baseline
+    for value in range(1000, 1100):
+        valuation(value)
+    assert app.result_popup is not None, app.result_label.cget('text')
+    widgets_before, rss_before = _count_widgets(root), _rss_bytes()
+    hits_before = app.valuation_cache.hits
+
+    for value in range(2000, 2000 + VALUATIONS):
+        valuation(value)
+    assert app.result_label.cget('fg') != 'red', app.result_label.cget('text')
+    assert app.valuation_cache.hits == hits_before
+
+    assert _count_widgets(root) <= widgets_before
+    if rss_before is not None:
+        assert _rss_bytes() - rss_before <= RSS_GROWTH_LIMIT
@@ -0,0 +1,9 @@
+# Defaults shared by the valuation tools and the app. Nothing here imports sklearn, so
+# the app can read them at startup without loading the model stack.
+
+# Bootstrap replicas behind a price range, and the range's coverage
+DEFAULT_REPLICAS = 200
+DEFAULT_LEVEL = 0.9
+
+# Comparable sales shown with each valuation
+DEFAULT_NEIGHBOURS = 5